@@ -167,6 +167,18 @@ async def trigger_sync():
         }
     )
 
+@app.get("/api/sync-runs")
+async def get_sync_runs(limit: int = 50):
+    """Recent sync runs with their stage timings, plus p50/p95 run duration"""
+    try:
+        # Imported lazily: the database and credentials only exist where the sync itself runs
+        from config import settings
+        from services.sync_runs import SyncRunStore
+        store = SyncRunStore(settings.zoho_organization_id)
+        return {"runs": store.history(limit), "duration": store.duration_percentiles()}
+    except Exception as e:
+        return {"runs": [], "duration": None, "message": f"Sync history is not available: {str(e)}"}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Categorization benchmark suite
+
+Measures CategorizationService.categorize_ticket, batch_categorize and
+get_similar_tickets on tickets drawn from the bundled CSV corpora, scaled up
+synthetically, against the default knowledge base and synthetic ones with
+more categories. Results are written as JSON so runs can be compared across
+commits.
+
+Usage:
+    python benchmarks/bench_categorization.py
+    python benchmarks/bench_categorization.py --sizes 1000,10000 --categories 17,100
+    python benchmarks/bench_categorization.py --compare benchmarks/results/<old>.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# The benchmark never talks to Zoho or ClickUp; use a throwaway database and placeholder credentials
+_BENCH_DB = Path(tempfile.mkdtemp(prefix="categorization_bench_")) / "bench.db"
+os.environ["DATABASE_URL"] = f"sqlite:///{_BENCH_DB}"
+# Time the scorer rather than the result cache (resampled tickets repeat), and seed the
+# knowledge base in the throwaway database instead of loading a precompiled artifact
+os.environ["CATEGORIZATION_CACHE_SIZE"] = "0"
+os.environ["CATEGORIZATION_CACHE_PERSIST"] = "false"
+os.environ["KB_ARTIFACT_PATH"] = ""
+for _name in [
+    "ZOHO_CLIENT_ID", "ZOHO_CLIENT_SECRET", "ZOHO_REFRESH_TOKEN", "ZOHO_ORGANIZATION_ID",
+    "CLICKUP_API_TOKEN", "CLICKUP_TEAM_ID", "LEARNING_PORTAL_LIST_ID", "FEATURE_FLAGS_LIST_ID",
+    "CONTENT_ACCESS_LIST_ID", "PORTAL_ACCESS_LIST_ID", "CONTENT_BUNDLE_LIST_ID", "QUIZ_ISSUES_LIST_ID",
+    "UNITS_UNLOCK_LIST_ID", "INSTRUCTOR_LIST_ID", "GROOMING_CHECK_LIST_ID",
+]:
+    os.environ.setdefault(_name, "benchmark")
+
+from loguru import logger
+from rich.console import Console
+from rich.table import Table
+
+from database import create_tables
+from models import ZohoTicket
+from services.categorization_service import CategorizationService
+
+console = Console()
+
+CORPORA = ["knowledge_base.csv", "Instructor portal Issues - Sheet1.csv"]
+PER_TICKET_SAMPLE = 2000
+
+
+def load_corpus():
+    """Load (issue, category) rows from the bundled CSV files"""
+    rows = []
+    for name in CORPORA:
+        path = ROOT / name
+        if not path.exists():
+            continue
+        with open(path, "r", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                issue = (row.get("Issues") or "").strip()
+                if issue:
+                    rows.append((issue, (row.get("Category") or "").strip()))
+    return rows
+
+
+def make_tickets(corpus, count, seed=0):
+    """Scale the corpus up to `count` tickets by resampling and lightly mixing issues"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    tickets = []
+
+    for i in range(count):
+        issue, _ = rng.choice(corpus)
+        if rng.random() < 0.3:
+            # Mix in part of another issue so scaled-up text is not pure repetition
+            other, _ = rng.choice(corpus)
+            words = other.split()
+            issue = f"{issue} {' '.join(words[:rng.randint(1, max(len(words), 1))])}"
+
+        subject = " ".join(issue.split()[:8])
+        tickets.append(ZohoTicket(
+            id=f"bench-{i}",
+            subject=subject,
+            description=issue,
+            status="Open",
+            priority=rng.choice(["High", "Medium", "Low"]),
+            created_time=start + timedelta(minutes=i),
+            modified_time=start + timedelta(minutes=i),
+            email=f"instructor{rng.randint(0, max(count // 20, 1))}@example.com"
+        ))
+
+    return tickets
+
+
+def make_knowledge_base(corpus, category_count, seed=0):
+    """Synthetic knowledge base whose keywords come from the corpus vocabulary"""
+    rng = random.Random(seed)
+    vocabulary = sorted({word.lower().strip(".,!?()'\"") for issue, _ in corpus for word in issue.split()} - {""})
+    entries = []
+
+    for i in range(category_count):
+        keywords = set()
+        for _ in range(rng.randint(8, 30)):
+            phrase_length = rng.choice([1, 1, 1, 2, 3])
+            keywords.add(" ".join(rng.choice(vocabulary) for _ in range(phrase_length)))
+        entries.append({
+            "category": f"Synthetic Category {i}",
+            "team": "Product/Tech",
+            "keywords": sorted(keywords),
+            "description": "Synthetic benchmark category",
+            "weight": 1.0
+        })
+
+    return entries
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(func, track_memory):
+    """Run func once, returning (result, seconds, peak MiB or None)"""
+    if track_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    peak = None
+    if track_memory:
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_categorize_ticket(service, tickets, track_memory):
+    """Per-ticket latency of categorize_ticket on a sample"""
+    sample = tickets[:PER_TICKET_SAMPLE]
+
+    def run():
+        latencies = []
+        for ticket in sample:
+            started = time.perf_counter()
+            service.categorize_ticket(ticket)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    latencies, elapsed, _ = measure(run, False)
+    peak = None
+    if track_memory:
+        _, _, peak = measure(run, True)
+
+    return {
+        "sampled": len(sample),
+        "tickets_per_sec": len(sample) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_memory_mb": peak
+    }
+
+
+def bench_batch(service, tickets, track_memory):
+    """Throughput of batch_categorize over the whole batch"""
+    _, elapsed, _ = measure(lambda: service.batch_categorize(tickets), False)
+    peak = None
+    if track_memory:
+        _, _, peak = measure(lambda: service.batch_categorize(tickets), True)
+
+    return {
+        "tickets": len(tickets),
+        "tickets_per_sec": len(tickets) / elapsed if elapsed else 0.0,
+        "p50_ms": None,
+        "p99_ms": None,
+        "total_s": elapsed,
+        "peak_memory_mb": peak
+    }
+
+
+def bench_similar(service, tickets, track_memory):
+    """Throughput of get_similar_tickets over the whole batch"""
+    groups, elapsed, _ = measure(lambda: service.get_similar_tickets(tickets), False)
+    peak = None
+    if track_memory:
+        _, _, peak = measure(lambda: service.get_similar_tickets(tickets), True)
+    return {
+        "tickets": len(tickets),
+        "tickets_per_sec": len(tickets) / elapsed if elapsed else 0.0,
+        "p50_ms": None,
+        "p99_ms": None,
+        "total_s": elapsed,
+        "groups": len(groups),
+        "peak_memory_mb": peak
+    }
+
+
+def current_commit():
+    """Short hash of the checked-out commit, if available"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def result_key(result):
+    return (result["benchmark"], result["tickets"], result["categories"])
+
+
+def print_results(results, baseline=None):
+    """Render results, with speed-up against a baseline run when given"""
+    baseline_index = {result_key(r): r for r in (baseline or {}).get("results", [])}
+
+    table = Table(title="Categorization Benchmarks")
+    table.add_column("Benchmark", style="cyan")
+    table.add_column("Tickets", justify="right")
+    table.add_column("Categories", justify="right")
+    table.add_column("Tickets/s", justify="right", style="magenta")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p99 ms", justify="right")
+    table.add_column("Peak MiB", justify="right")
+    if baseline:
+        table.add_column("vs baseline", justify="right", style="green")
+
+    def fmt(value, digits=2):
+        return "-" if value is None else f"{value:.{digits}f}"
+
+    for result in results:
+        row = [
+            result["benchmark"],
+            str(result["tickets"]),
+            str(result["categories"]),
+            fmt(result["tickets_per_sec"], 0),
+            fmt(result["p50_ms"], 3),
+            fmt(result["p99_ms"], 3),
+            fmt(result["peak_memory_mb"], 1),
+        ]
+        if baseline:
+            previous = baseline_index.get(result_key(result))
+            if previous and previous["tickets_per_sec"]:
+                row.append(f"{result['tickets_per_sec'] / previous['tickets_per_sec']:.2f}x")
+            else:
+                row.append("-")
+        table.add_row(*row)
+
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the categorization hot path")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated ticket counts")
+    parser.add_argument("--categories", default="17,500", help="Comma-separated category counts (17 = default knowledge base)")
+    parser.add_argument("--similar-max", type=int, default=5000, help="Largest batch to run get_similar_tickets on")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory passes")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    category_counts = [int(count) for count in args.categories.split(",") if count]
+    track_memory = not args.no_memory
+
+    corpus = load_corpus()
+    if not corpus:
+        console.print("❌ No CSV corpus found", style="red")
+        sys.exit(1)
+
+    create_tables()
+    service = CategorizationService()
+    default_kb = service.kb_service.get_all_knowledge_base()
+    results = []
+
+    try:
+        for category_count in category_counts:
+            if category_count == len(default_kb):
+                service.update_knowledge_base_from_data(default_kb)
+            else:
+                service.update_knowledge_base_from_data(make_knowledge_base(corpus, category_count))
+
+            for size in sizes:
+                console.print(f"⏱️  {size} tickets, {category_count} categories...")
+                tickets = make_tickets(corpus, size)
+                cases = [
+                    ("categorize_ticket", bench_categorize_ticket),
+                    ("batch_categorize", bench_batch),
+                ]
+                if size <= args.similar_max:
+                    cases.append(("get_similar_tickets", bench_similar))
+
+                for name, bench in cases:
+                    result = bench(service, tickets, track_memory)
+                    result.update({"benchmark": name, "tickets": size, "categories": category_count})
+                    results.append(result)
+    finally:
+        service.close()
+
+    report = {
+        "commit": current_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results
+    }
+
+    output = Path(args.output) if args.output else (
+        ROOT / "benchmarks" / "results" / f"{datetime.now():%Y%m%d-%H%M%S}-{report['commit']}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+
+    print_results(results, baseline)
+    console.print(f"📄 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,59 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     sync_interval_hours: int = 1
     max_retries: int = 3
+    max_concurrency: int = 10  # ClickUp tasks created at the same time
+    pipeline_page_buffer: int = 2  # Zoho pages buffered between sync stages
+    pipeline_ticket_buffer: int = 200  # Categorized tickets waiting for a ClickUp worker
+    sync_run_lease_seconds: int = 300  # A running sync whose heartbeat is older than this is treated as crashed
+    pipeline_categorize_batch: int = 200  # Deduplicated tickets (several Zoho pages) categorized together in a sync
+    pipeline_categorize_wait_ms: int = 250  # Longest a partial batch waits for more pages before it is categorized
+    sync_log_batch_size: int = 200  # SyncLog rows written per transaction
+    sync_log_flush_interval_ms: int = 500  # Longest a buffered row waits before being written
+    slowest_tickets_reported: int = 5  # Slowest tickets listed in each sync run's metrics
+    incremental_sync_enabled: bool = True  # Fetch only tickets modified since the last completed run
+    sync_watermark_overlap_seconds: int = 300  # Re-fetched margin before the watermark, for clock skew
+    retry_queue_enabled: bool = True  # Retry failed tickets in the background instead of inline
+    retry_base_delay_seconds: float = 30.0
+    retry_max_delay_seconds: float = 3600.0
+    retry_drain_interval_seconds: int = 60
+    retry_drain_batch_size: int = 100
+    
+    # HTTP Client Settings
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 30.0
+    http_timeout_seconds: float = 30.0
+    http_connect_timeout_seconds: float = 10.0
+    http2_enabled: bool = False  # Requires the h2 package
+    
+    # Categorization Settings
+    vectorized_batch_threshold: int = 200  # Batches this large are scored as one matrix product
+    parallel_batch_threshold: int = 5000  # Batches this large are split across worker processes (bulk callers, not a sync)
+    categorization_workers: int = 0  # 0 uses every CPU core
+    categorization_chunk_size: int = 500
+    categorization_cache_size: int = 10000
+    categorization_cache_ttl_seconds: int = 86400
+    categorization_cache_persist: bool = False  # Also keep cached results in the database
+    categorization_cascade_enabled: bool = False  # Send low-margin tickets to the TF-IDF stage
+    cascade_margin: int = 5  # Minimum lead over the runner-up for a confident keyword result (5 sends only exact ties)
+    cascade_min_similarity: float = 0.3
+    cascade_training_csv: str = "knowledge_base.csv"  # Relative paths are taken from the repository root
+    kb_artifact_path: str = "knowledge_base.artifact"  # Loaded at startup when present (see compile_knowledge_base.py)
+    kb_version_poll_seconds: float = 5.0  # How often to check the database for knowledge base writes by other processes
+    
+    # Duplicate Detection Settings
+    duplicate_detection_method: str = "blocking"  # blocking, lsh, ngram (typo-tolerant) or exhaustive
+    lsh_bands: int = 16
+    lsh_rows: int = 4
+    ngram_size: int = 3
+    ngram_dimensions: int = 262144  # Width of the hashed n-gram vectors
+    ngram_top_k: int = 10  # Neighbours kept per ticket
+    ngram_block_memory_mb: int = 256  # Upper bound on each block of the similarity matrix
+    similarity_index_enabled: bool = True  # Also check new tickets against recently processed ones
+    similarity_index_retention_days: int = 14
+    simhash_dedup_enabled: bool = False  # Also match new tickets against SimHash fingerprints on SyncLog (same retention as the similarity index)
+    simhash_max_distance: int = 3  # Hamming distance in bits (0-3)
+    processed_id_cache_size: int = 50000  # Recently processed ticket ids kept in memory (0 disables)
     
     class Config:
         env_file = ".env"
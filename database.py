@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.schema import CreateIndex
+from loguru import logger
 from sqlalchemy.orm import sessionmaker
 from models import Base
 from config import settings
@@ -15,6 +17,28 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 def create_tables():
     """Create all database tables"""
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+
+def _add_missing_columns():
+    """Add nullable columns introduced after a table was first created (create_all never alters tables)"""
+    inspector = inspect(engine)
+    
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing]
+        if not missing:
+            continue
+        
+        with engine.begin() as connection:
+            for column in missing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                logger.info(f"Added column {table.name}.{column.name}")
+            
+            missing_names = {column.name for column in missing}
+            for index in table.indexes:
+                if missing_names.intersection(column.name for column in index.columns):
+                    connection.execute(CreateIndex(index))
 
 def get_db():
     """Get database session"""
@@ -22,4 +46,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def chunked(values, size: int = 500):
+    """Split a list into slices small enough for an IN (...) clause on any backend"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
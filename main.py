@@ -14,17 +14,19 @@ from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from services.automation_service import AutomationService
+from services.http_client import start_http_client, close_http_client
 from scheduler import SyncScheduler
 from database import create_tables
 from config import settings
 
 console = Console()
 
-async def run_single_sync():
+async def run_single_sync(full_resync: bool = False):
     """Run a single synchronization"""
     console.print(Panel.fit("🚀 Starting Zoho to ClickUp Sync", style="bold blue"))
     
     automation_service = AutomationService()
+    await start_http_client()
     
     with Progress(
         SpinnerColumn(),
@@ -35,7 +37,7 @@ async def run_single_sync():
         task = progress.add_task("Synchronizing tickets...", total=None)
         
         try:
-            result = await automation_service.run_sync()
+            result = await automation_service.run_sync(full_resync=full_resync)
             
             # Display results
             table = Table(title="Sync Results")
@@ -47,10 +49,31 @@ async def run_single_sync():
             table.add_row("Successful", str(result.success))
             table.add_row("Errors", str(result.errors))
             table.add_row("Duplicates", str(result.duplicates))
+            table.add_row("Queued for Retry", str(result.retrying))
+            table.add_row("Inline Retries", str(result.retries))
+            table.add_row("HTTP Requests", str(result.http_requests))
+            table.add_row("HTTP Sent / Received", f"{result.http_bytes_sent / 1024:.1f} KB / {result.http_bytes_received / 1024:.1f} KB")
             table.add_row("Execution Time", f"{result.execution_time:.2f}s")
             
             console.print(table)
             
+            # Where the time went (stages overlap, so they do not add up to the execution time)
+            stages = Table(title="Stage Timings")
+            stages.add_column("Stage", style="cyan")
+            stages.add_column("Time", style="magenta")
+            stages.add_column("Items", style="magenta")
+            for stage, seconds in result.stage_seconds.items():
+                stages.add_row(stage, f"{seconds:.2f}s", str(result.stage_counts.get(stage, "")))
+            console.print(stages)
+            
+            if result.slowest_tickets:
+                slowest = ", ".join(f"{t['ticket_id']} ({t['seconds']:.2f}s, {t['status']})" for t in result.slowest_tickets)
+                console.print(f"🐢 Slowest tickets: {slowest}")
+            
+            percentiles = automation_service.sync_runs.duration_percentiles()
+            if percentiles["runs"]:
+                console.print(f"⏱️  Last {percentiles['runs']} runs: p50 {percentiles['p50']:.2f}s, p95 {percentiles['p95']:.2f}s")
+            
             if result.errors > 0:
                 console.print(f"⚠️  {result.errors} tickets failed to process", style="yellow")
             
@@ -59,6 +82,8 @@ async def run_single_sync():
         except Exception as e:
             console.print(f"❌ Sync failed: {str(e)}", style="red")
             sys.exit(1)
+        finally:
+            await close_http_client()
 
 async def run_server():
     """Run the web server with scheduler"""
@@ -81,7 +106,12 @@ async def run_server():
         log_level=settings.log_level.lower()
     )
     server = uvicorn.Server(config)
-    await server.serve()
+    
+    await start_http_client()
+    try:
+        await server.serve()
+    finally:
+        await close_http_client()
 
 def show_help():
     """Show help information"""
@@ -89,15 +119,17 @@ def show_help():
 🔧 Zoho to ClickUp Automation System
 
 Usage:
-    python main.py [command]
+    python main.py [command] [options]
 
 Commands:
-    sync        Run a single synchronization
+    sync        Run a single synchronization (add --full-resync to
+                re-fetch the last 24 hours instead of only new tickets)
     server      Start the web server with scheduler (default)
     help        Show this help message
 
 Examples:
     python main.py sync          # Run one-time sync
+    python main.py sync --full-resync
     python main.py server        # Start web server
     python main.py               # Start web server (default)
 
@@ -136,7 +168,7 @@ async def main():
     command = sys.argv[1] if len(sys.argv) > 1 else "server"
     
     if command == "sync":
-        await run_single_sync()
+        await run_single_sync(full_resync="--full-resync" in sys.argv[2:])
     elif command == "server":
         await run_server()
     elif command == "help":
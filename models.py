@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, Boolean, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, PrivateAttr
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
@@ -16,8 +16,14 @@ class SyncLog(Base):
     clickup_task_id = Column(String, nullable=True)
     category = Column(String, nullable=False)
     team = Column(String, nullable=False)
-    status = Column(String, default="pending")  # pending, success, failed, duplicate
+    status = Column(String, default="pending")  # pending, success, failed, duplicate, retrying
     error_message = Column(Text, nullable=True)
+    # 64-bit SimHash of the ticket text and its four 16-bit blocks (see services.simhash)
+    simhash = Column(BigInteger, nullable=True)
+    simhash_block_0 = Column(Integer, nullable=True, index=True)
+    simhash_block_1 = Column(Integer, nullable=True, index=True)
+    simhash_block_2 = Column(Integer, nullable=True, index=True)
+    simhash_block_3 = Column(Integer, nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -34,12 +40,111 @@ class KnowledgeBase(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+class KnowledgeBaseVersion(Base):
+    __tablename__ = "kb_version"
+    
+    id = Column(Integer, primary_key=True)  # Single row, id 1
+    version = Column(Integer, nullable=False, default=0)  # Bumped in the same transaction as every knowledge base write
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class CategorizationCacheEntry(Base):
+    __tablename__ = "categorization_cache"
+    
+    cache_key = Column(String, primary_key=True)  # knowledge base fingerprint + content hash
+    category = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
+
+class TicketSignature(Base):
+    __tablename__ = "ticket_signatures"
+    
+    zoho_ticket_id = Column(String, primary_key=True)
+    email = Column(String, nullable=True, index=True)
+    content_hash = Column(String, nullable=False, index=True)  # Fingerprint of subject + description
+    subject_tokens = Column(Text, nullable=False)  # JSON list of subject words
+    signature = Column(Text, nullable=False)  # Comma-separated MinHash values
+    modified_time = Column(DateTime, nullable=True)  # UTC modifiedTime, picks the latest of several matches
+    created_at = Column(DateTime, nullable=False, index=True)
+
+class TicketSignatureBand(Base):
+    __tablename__ = "ticket_signature_bands"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    band_key = Column(BigInteger, nullable=False, index=True)
+    zoho_ticket_id = Column(String, nullable=False, index=True)
+
+class RetryQueueItem(Base):
+    __tablename__ = "retry_queue"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    zoho_ticket_id = Column(String, unique=True, index=True)
+    payload = Column(Text, nullable=False)  # ProcessedTicket as JSON
+    attempts = Column(Integer, nullable=False, default=0)  # Failed attempts so far
+    next_attempt_at = Column(DateTime, nullable=False, index=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class SyncWatermark(Base):
+    __tablename__ = "sync_watermarks"
+    
+    organization_id = Column(String, primary_key=True)
+    modified_time = Column(DateTime, nullable=False)  # UTC modifiedTime of the last fully processed ticket
+    ticket_id = Column(String, nullable=False)  # Tiebreak between tickets modified at the same instant
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class SyncRun(Base):
+    __tablename__ = "sync_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(String, nullable=False, index=True)
+    status = Column(String, nullable=False, index=True)  # running, completed, failed, abandoned
+    # Lease: the process running it and when it last reported in; a stale heartbeat means it crashed
+    owner = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    full_resync = Column(Boolean, default=False)
+    hours_back = Column(Integer, nullable=False)
+    modified_since = Column(DateTime, nullable=True)  # UTC start of an incremental fetch
+    # Checkpoint: everything up to this Zoho page is processed and logged
+    pages_committed = Column(Integer, nullable=False, default=0)
+    next_page_url = Column(Text, nullable=True)  # Page after the last committed one; None once all pages are committed
+    tickets_fetched = Column(Integer, nullable=False, default=0)
+    tickets_handed_off = Column(Integer, nullable=False, default=0)  # Sent on to ClickUp task creation
+    tickets_logged = Column(Integer, nullable=False, default=0)  # SyncLog rows written
+    failed_modified_time = Column(DateTime, nullable=True)  # First ticket that failed outright; holds back the watermark
+    failed_ticket_id = Column(String, nullable=True)
+    error_message = Column(Text, nullable=True)
+    # Summary of the finished run (see SyncResult)
+    execution_time = Column(Float, nullable=True, index=True)
+    total_tickets = Column(Integer, nullable=True)
+    processed = Column(Integer, nullable=True)
+    duplicates = Column(Integer, nullable=True)
+    success = Column(Integer, nullable=True)
+    errors = Column(Integer, nullable=True)
+    retrying = Column(Integer, nullable=True)
+    retries = Column(Integer, nullable=True)
+    http_requests = Column(Integer, nullable=True)
+    http_bytes_sent = Column(BigInteger, nullable=True)
+    http_bytes_received = Column(BigInteger, nullable=True)
+    metrics = Column(Text, nullable=True)  # JSON: stage_seconds, stage_counts and slowest_tickets
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class ClickUpTaskRecord(Base):
+    __tablename__ = "clickup_task_records"
+    
+    zoho_ticket_id = Column(String, primary_key=True)
+    clickup_task_id = Column(String, nullable=False)
+    sync_run_id = Column(Integer, nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class ProcessingStatus(str, Enum):
     PENDING = "pending"
     PROCESSING = "processing"
     SUCCESS = "success"
     FAILED = "failed"
     DUPLICATE = "duplicate"
+    RETRYING = "retrying"
 
 class TicketCategory(str, Enum):
     LEARNING_PORTAL = "Learning Portal Issues"
@@ -62,6 +167,9 @@ class ZohoTicket(BaseModel):
     modified_time: datetime
     contact_id: Optional[str] = None
     email: Optional[str] = None
+    
+    # NormalizedTicket computed once at ingestion (see services.ticket_normalizer)
+    _normalized: Any = PrivateAttr(default=None)
 
 class ClickUpTask(BaseModel):
     name: str
@@ -85,5 +193,14 @@ class SyncResult(BaseModel):
     duplicates: int
     errors: int
     success: int
+    retrying: int = 0  # Failed once and handed to the retry queue
     execution_time: float
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+    sync_run_id: Optional[int] = None
+    stage_seconds: Dict[str, float] = {}  # Time each stage spent working; ClickUp time is summed over workers
+    stage_counts: Dict[str, int] = {}  # Items through each stage
+    http_requests: int = 0
+    http_bytes_sent: int = 0
+    http_bytes_received: int = 0
+    retries: int = 0  # Inline retry attempts (tickets queued for a background retry are counted in retrying)
+    slowest_tickets: List[Dict[str, Any]] = []  # Ticket id, status and seconds, slowest first
\ No newline at end of file
@@ -28,6 +28,15 @@ class SyncScheduler:
             next_run_time=datetime.now()  # Run immediately on start
         )
         
+        # Add retry queue drain job
+        self.scheduler.add_job(
+            func=self._drain_retry_queue,
+            trigger=IntervalTrigger(seconds=settings.retry_drain_interval_seconds),
+            id='retry_job',
+            name='Retry Failed Tickets',
+            replace_existing=True
+        )
+        
         # Add daily cleanup job
         self.scheduler.add_job(
             func=self._cleanup_old_logs,
@@ -59,6 +68,13 @@ class SyncScheduler:
         except Exception as e:
             logger.error(f"Scheduled sync failed: {str(e)}")
     
+    async def _drain_retry_queue(self):
+        """Retry queue drain job"""
+        try:
+            await self.automation_service.drain_retry_queue()
+        except Exception as e:
+            logger.error(f"Retry queue drain failed: {str(e)}")
+    
     async def _cleanup_old_logs(self):
         """Clean up old log entries (keep last 1000)"""
         try:
@@ -83,14 +99,24 @@ class SyncScheduler:
             
             db.close()
             
+            # Drop expired persisted categorization results
+            purged_count = self.automation_service.categorization_service.cache.purge_expired()
+            if purged_count:
+                logger.info(f"Purged {purged_count} expired categorization cache entries")
+            
+            # Forget tickets that fell out of the cross-run duplicate window
+            expired_count = self.automation_service.categorization_service.similarity_index.purge_expired()
+            if expired_count:
+                logger.info(f"Removed {expired_count} expired tickets from the similarity index")
+            
         except Exception as e:
             logger.error(f"Cleanup job failed: {str(e)}")
     
-    async def trigger_manual_sync(self) -> dict:
+    async def trigger_manual_sync(self, full_resync: bool = False) -> dict:
         """Trigger manual sync and return result"""
         try:
-            logger.info("Manual sync triggered")
-            result = await self.automation_service.run_sync()
+            logger.info(f"Manual {'full resync' if full_resync else 'sync'} triggered")
+            result = await self.automation_service.run_sync(full_resync=full_resync)
             return {
                 "success": True,
                 "result": result.dict(),
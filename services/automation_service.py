@@ -1,159 +1,434 @@
 import asyncio
+import contextlib
+import heapq
+import time
 from typing import List, Dict, Optional
 from datetime import datetime
 from loguru import logger
-from sqlalchemy.orm import Session
 
 from models import ZohoTicket, ProcessedTicket, ProcessingStatus, SyncResult, SyncLog
 from services.zoho_service import ZohoService
 from services.clickup_service import ClickUpService
 from services.categorization_service import CategorizationService
-from database import get_db
+from services.processed_ids import ProcessedIdLookup
+from services.simhash import SimHashLookup, sync_log_simhash_columns
+from services.retry_queue import RetryQueue
+from services.sync_log_writer import SyncLogWriter
+from services.sync_watermark import SyncWatermarkStore
+from services.sync_runs import SyncRunStore, SyncRunProgress, RUN_COMPLETED, RUN_FAILED, RUN_ABANDONED
+from services.task_records import ClickUpTaskRecords
+from services.http_client import http_stats
+from database import get_db, create_tables
 from config import settings
 
 class AutomationService:
     def __init__(self):
+        # Every entry point (CLI sync, scheduler, server) needs the current schema before the first query
+        create_tables()
         self.zoho_service = ZohoService()
         self.clickup_service = ClickUpService()
         self.categorization_service = CategorizationService()
+        self.processed_ids = ProcessedIdLookup(cache_size=settings.processed_id_cache_size)
+        self.simhash_lookup = SimHashLookup(
+            max_distance=settings.simhash_max_distance,
+            retention_days=settings.similarity_index_retention_days
+        )
+        self.retry_queue = RetryQueue(
+            base_delay_seconds=settings.retry_base_delay_seconds,
+            max_delay_seconds=settings.retry_max_delay_seconds
+        )
+        self.sync_log_writer = SyncLogWriter(
+            batch_size=settings.sync_log_batch_size,
+            flush_interval_ms=settings.sync_log_flush_interval_ms,
+            on_flush=self._remember_logged
+        )
+        # The retry drain runs beside syncs and must not flush (or fail) rows that a sync checkpoint owns
+        self.retry_log_writer = SyncLogWriter(
+            batch_size=settings.sync_log_batch_size,
+            flush_interval_ms=settings.sync_log_flush_interval_ms,
+            on_flush=self._remember_logged
+        )
+        self.sync_watermark = SyncWatermarkStore(
+            settings.zoho_organization_id,
+            overlap_seconds=settings.sync_watermark_overlap_seconds
+        )
+        self.sync_runs = SyncRunStore(settings.zoho_organization_id, lease_seconds=settings.sync_run_lease_seconds)
+        self.task_records = ClickUpTaskRecords()
+        self.retry_attempts = 0  # Inline retries since startup; each run reports its own difference
+        self.duplicates_logged = 0  # Duplicate rows logged since startup; each page counts its own difference
     
-    async def run_sync(self, hours_back: int = 24) -> SyncResult:
-        """Main synchronization process"""
+    async def run_sync(self, hours_back: int = 24, full_resync: bool = False) -> SyncResult:
+        """Main synchronization process.
+        
+        Runs as a pipeline of stages joined by bounded queues: Zoho pages are
+        deduplicated as they arrive, categorized a few pages at a time, and
+        ClickUp tasks are created while later pages are still downloading. A
+        full queue makes the stage before it wait, so memory does not grow
+        with the window.
+        
+        Only tickets modified since the stored watermark are fetched; the
+        last hours_back hours are fetched instead on the first run, when
+        incremental sync is disabled, or when full_resync is set. A run
+        interrupted by a crash is resumed from its last checkpointed page.
+        Raises RuntimeError while another run (here or in another process)
+        still holds its lease.
+        """
         start_time = datetime.now()
-        logger.info(f"Starting sync process for tickets from last {hours_back} hours")
+        live_run = self.sync_runs.live_run()
+        if live_run is not None:
+            self.sync_runs.log_live_run(live_run)
+            raise RuntimeError(f"Sync run {live_run.id} is already in progress (owner {live_run.owner})")
         
-        try:
-            # Step 1: Fetch tickets from Zoho
-            tickets = await self.zoho_service.fetch_recent_tickets(hours_back)
-            logger.info(f"Fetched {len(tickets)} tickets from Zoho")
-            
-            if not tickets:
-                logger.info("No tickets to process")
-                return SyncResult(
-                    total_tickets=0,
-                    processed=0,
-                    duplicates=0,
-                    errors=0,
-                    success=0,
-                    execution_time=0,
-                    timestamp=start_time
-                )
-            
+        run = self.sync_runs.interrupted_run()
+        if run is not None and not self.sync_runs.claim(run.id):
+            raise RuntimeError(f"Sync run {run.id} was just taken over by another process")
+        if run is not None and full_resync:
+            self.sync_runs.finish(run.id, RUN_ABANDONED, "Superseded by a full resync")
+            run = None
+        
+        if run is not None:
+            modified_since = run.modified_since
+            hours_back = run.hours_back
+            logger.info(f"Resuming interrupted sync run {run.id} after {run.pages_committed} committed pages")
+        else:
+            modified_since = None
+            if settings.incremental_sync_enabled and not full_resync:
+                modified_since = self.sync_watermark.fetch_from()
+            if modified_since is not None:
+                logger.info(f"Starting sync process for tickets modified since {modified_since:%Y-%m-%d %H:%M:%S} UTC")
+            else:
+                logger.info(f"Starting sync process for tickets from last {hours_back} hours")
+            run = self.sync_runs.start(hours_back, modified_since, full_resync)
+        
+        progress = SyncRunProgress(run, hold_back_hours=hours_back)
+        counts = {"fetched": 0, "unique": 0, "processed": 0, "pages": 0}
+        stage_seconds = {"fetch": 0.0, "dedup": 0.0, "categorize": 0.0, "clickup": 0.0, "logging": 0.0}
+        slowest: List[tuple] = []  # Min-heap of (seconds, ticket id, status) holding the slowest tickets
+        http_before = http_stats()
+        retries_before = self.retry_attempts
+        rows_before = self.sync_log_writer.rows_written
+        flush_seconds_before = self.sync_log_writer.flush_seconds
+        statuses: Dict[ProcessingStatus, int] = {}
+        page_buffer = max(1, settings.pipeline_page_buffer)
+        fetched_pages: asyncio.Queue = asyncio.Queue(maxsize=page_buffer)
+        unique_pages: asyncio.Queue = asyncio.Queue(maxsize=page_buffer)
+        pending_tasks: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.pipeline_ticket_buffer))
+        workers = max(1, settings.max_concurrency)
+        categorize_batch = max(1, settings.pipeline_categorize_batch)
+        categorize_wait = max(0, settings.pipeline_categorize_wait_ms) / 1000
+        
+        # Each stage ends its output with None; a failing stage sends nothing and the run cancels every stage
+        async def fetch_stage():
+            # Step 1: Fetch tickets from Zoho, page by page
+            if not progress.fetch_finished:
+                started = time.perf_counter()
+                async for page, next_url in self.zoho_service.iter_ticket_page_cursors(
+                    hours_back, modified_since, start_url=progress.next_page_url
+                ):
+                    stage_seconds["fetch"] += time.perf_counter() - started
+                    counts["fetched"] += len(page)
+                    counts["pages"] += 1
+                    page_number = progress.page_fetched(page, next_url)
+                    await fetched_pages.put((page_number, page))
+                    started = time.perf_counter()
+                stage_seconds["fetch"] += time.perf_counter() - started
+            await fetched_pages.put(None)
+        
+        async def dedup_stage():
             # Step 2: Remove duplicates and check already processed
-            unique_tickets = await self._filter_duplicates(tickets)
-            logger.info(f"After duplicate removal: {len(unique_tickets)} tickets")
-            
-            # Step 3: Categorize tickets
-            categorizations = self.categorization_service.batch_categorize(unique_tickets)
-            
-            # Step 4: Process each ticket
-            results = await self._process_tickets(unique_tickets, categorizations)
-            
-            # Step 5: Generate summary
-            execution_time = (datetime.now() - start_time).total_seconds()
-            
-            sync_result = SyncResult(
-                total_tickets=len(tickets),
-                processed=len(results),
-                duplicates=len(tickets) - len(unique_tickets),
-                errors=sum(1 for r in results if r.processing_status == ProcessingStatus.FAILED),
-                success=sum(1 for r in results if r.processing_status == ProcessingStatus.SUCCESS),
-                execution_time=execution_time,
-                timestamp=start_time
+            while (item := await fetched_pages.get()) is not None:
+                page_number, page = item
+                started = time.perf_counter()
+                duplicates_before = self.duplicates_logged
+                unique_tickets = await self._filter_duplicates(page)
+                counts["unique"] += len(unique_tickets)
+                
+                # Index accepted tickets right away so later pages (and runs) see them
+                if settings.similarity_index_enabled:
+                    self.categorization_service.similarity_index.add(unique_tickets)
+                stage_seconds["dedup"] += time.perf_counter() - started
+                if progress.page_deduplicated(page_number, unique_tickets, self.duplicates_logged - duplicates_before):
+                    self._commit_pages(progress)
+                if unique_tickets:
+                    await unique_pages.put(unique_tickets)
+            await unique_pages.put(None)
+        
+        async def categorize_stage():
+            # Step 3: Categorize tickets, joining pages so batch_categorize can score them as one matrix
+            loop = asyncio.get_running_loop()
+            finished = False
+            while not finished:
+                batch: List[ZohoTicket] = []
+                deadline = None
+                while len(batch) < categorize_batch:
+                    if deadline is None:
+                        page = await unique_pages.get()
+                        deadline = loop.time() + categorize_wait
+                    else:
+                        # A partial batch only waits briefly, so a small sync reaches ClickUp without delay
+                        try:
+                            page = await asyncio.wait_for(unique_pages.get(), max(0.0, deadline - loop.time()))
+                        except asyncio.TimeoutError:
+                            break
+                    if page is None:
+                        finished = True
+                        break
+                    batch.extend(page)
+                if not batch:
+                    continue
+                
+                started = time.perf_counter()
+                categorizations = self.categorization_service.batch_categorize(batch)
+                processed_tickets = self._build_processed_tickets(batch, categorizations)
+                stage_seconds["categorize"] += time.perf_counter() - started
+                for processed_ticket in processed_tickets:
+                    await pending_tasks.put(processed_ticket)
+            for _ in range(workers):
+                await pending_tasks.put(None)
+        
+        async def create_stage():
+            # Step 4: Process each ticket (one worker per concurrent ClickUp call)
+            while (processed_ticket := await pending_tasks.get()) is not None:
+                started = time.perf_counter()
+                await self._process_one(processed_ticket, sync_run_id=progress.run_id)
+                seconds = time.perf_counter() - started
+                stage_seconds["clickup"] += seconds
+                counts["processed"] += 1
+                status = processed_ticket.processing_status
+                entry = (seconds, processed_ticket.zoho_ticket.id, status.value)
+                if len(slowest) < settings.slowest_tickets_reported:
+                    heapq.heappush(slowest, entry)
+                elif slowest and entry > slowest[0]:
+                    heapq.heapreplace(slowest, entry)
+                statuses[status] = statuses.get(status, 0) + 1
+                if progress.ticket_processed(processed_ticket):
+                    self._commit_pages(progress)
+        
+        stages = [
+            asyncio.create_task(fetch_stage()),
+            asyncio.create_task(dedup_stage()),
+            asyncio.create_task(categorize_stage()),
+            *(asyncio.create_task(create_stage()) for _ in range(workers))
+        ]
+        
+        async def heartbeat():
+            # Keep the run's lease alive between checkpoints (a slow page can take a while)
+            while True:
+                await asyncio.sleep(self.sync_runs.lease_seconds / 3)
+                self.sync_runs.heartbeat(progress.run_id)
+        
+        heartbeat_task = asyncio.create_task(heartbeat()) if progress.run_id is not None else None
+        
+        # SyncLog rows are written in batches; leaving the block flushes the rest, even on failure
+        try:
+            async with self.sync_log_writer:
+                try:
+                    await asyncio.gather(*stages)
+                except BaseException as e:
+                    for stage in stages:
+                        stage.cancel()
+                    await asyncio.gather(*stages, return_exceptions=True)
+                    if isinstance(e, Exception):
+                        logger.error(f"Sync process failed: {str(e)}")
+                        if progress.run_id is not None:
+                            self.sync_runs.finish(progress.run_id, RUN_FAILED, str(e))
+                    elif progress.run_id is not None:
+                        # An interrupted run (cancelled, or the process stopping) stays running; dropping
+                        # the lease lets the next sync resume it without waiting for the lease to expire
+                        self.sync_runs.release(progress.run_id)
+                    raise
+        finally:
+            if heartbeat_task is not None:
+                heartbeat_task.cancel()
+        
+        if not counts["fetched"]:
+            logger.info("No tickets to process")
+        
+        # Step 5: Generate summary
+        execution_time = (datetime.now() - start_time).total_seconds()
+        stage_seconds["logging"] = self.sync_log_writer.flush_seconds - flush_seconds_before
+        http_after = http_stats()
+        
+        sync_result = SyncResult(
+            total_tickets=counts["fetched"],
+            processed=counts["processed"],
+            duplicates=counts["fetched"] - counts["unique"],
+            errors=statuses.get(ProcessingStatus.FAILED, 0),
+            success=statuses.get(ProcessingStatus.SUCCESS, 0),
+            retrying=statuses.get(ProcessingStatus.RETRYING, 0),
+            execution_time=execution_time,
+            timestamp=start_time,
+            sync_run_id=progress.run_id,
+            stage_seconds={stage: round(seconds, 3) for stage, seconds in stage_seconds.items()},
+            stage_counts={
+                "pages": counts["pages"],
+                "fetch": counts["fetched"],
+                "dedup": counts["fetched"],
+                "categorize": counts["unique"],
+                "clickup": counts["processed"],
+                "logging": self.sync_log_writer.rows_written - rows_before
+            },
+            http_requests=http_after["requests"] - http_before["requests"],
+            http_bytes_sent=http_after["bytes_sent"] - http_before["bytes_sent"],
+            http_bytes_received=http_after["bytes_received"] - http_before["bytes_received"],
+            retries=self.retry_attempts - retries_before,
+            slowest_tickets=[
+                {"ticket_id": ticket_id, "status": status, "seconds": round(seconds, 3)}
+                for seconds, ticket_id, status in sorted(slowest, reverse=True)
+            ]
+        )
+        
+        if progress.run_id is not None:
+            self.sync_runs.finish(progress.run_id, RUN_COMPLETED, result=sync_result)
+        
+        timings = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in sync_result.stage_seconds.items())
+        logger.info(f"Sync completed in {execution_time:.2f}s: {sync_result.success} success, {sync_result.errors} errors, {sync_result.retrying} queued for retry, {sync_result.duplicates} duplicates")
+        logger.info(f"Sync stages: {timings}; {sync_result.http_requests} HTTP requests, {sync_result.retries} retries")
+        return sync_result
+    
+    def _commit_pages(self, progress: SyncRunProgress):
+        """Checkpoint the run and advance the watermark past every page that is fully handled"""
+        if not progress.has_ready_pages():
+            return
+        
+        # The SyncLog rows of these pages must be written before the checkpoint claims them; a failed
+        # write raises here, so the pages stay uncommitted and the watermark stays behind them
+        self.sync_log_writer.flush()
+        ready = progress.ready_pages()
+        
+        done_keys = []
+        for page in ready:
+            progress.tickets_fetched += len(page["keys"])
+            progress.tickets_handed_off += page["handed_off"]
+            progress.tickets_logged += page["rows"]
+            progress.next_page_url = page["next_url"]
+            if "first_failure" in page:
+                progress.first_failure = min(page["first_failure"], progress.first_failure or page["first_failure"])
+            done_keys.extend(page["keys"])
+        
+        # Tickets from the first recent outright failure on stay behind the watermark so the next run retries them
+        done_keys = [key for key in done_keys if progress.first_failure is None or key < progress.first_failure]
+        if done_keys:
+            self.sync_watermark.advance(max(done_keys))
+        
+        if progress.run_id is not None:
+            failed_modified_time, failed_ticket_id = progress.first_failure or (None, None)
+            self.sync_runs.checkpoint(
+                progress.run_id,
+                pages_committed=progress.pages_committed,
+                next_page_url=progress.next_page_url,
+                tickets_fetched=progress.tickets_fetched,
+                tickets_handed_off=progress.tickets_handed_off,
+                tickets_logged=progress.tickets_logged,
+                failed_modified_time=failed_modified_time,
+                failed_ticket_id=failed_ticket_id
             )
-            
-            logger.info(f"Sync completed in {execution_time:.2f}s: {sync_result.success} success, {sync_result.errors} errors, {sync_result.duplicates} duplicates")
-            return sync_result
-            
-        except Exception as e:
-            logger.error(f"Sync process failed: {str(e)}")
-            raise
     
     async def _filter_duplicates(self, tickets: List[ZohoTicket]) -> List[ZohoTicket]:
         """Filter out duplicate and already processed tickets"""
-        db = next(get_db())
+        # Get already processed ticket IDs (only those in this batch)
+        processed_ids = self.processed_ids.processed_ids(t.id for t in tickets)
         
-        try:
-            # Get already processed ticket IDs
-            processed_ids = set(
-                log.zoho_ticket_id for log in 
-                db.query(SyncLog).filter(
-                    SyncLog.status.in_([ProcessingStatus.SUCCESS, ProcessingStatus.DUPLICATE])
-                ).all()
-            )
-            
-            # Filter out already processed tickets
-            new_tickets = [t for t in tickets if t.id not in processed_ids]
-            
-            # Find similar tickets within the current batch
-            similar_groups = self.categorization_service.get_similar_tickets(new_tickets)
-            
-            # Keep only the most recent ticket from each similar group
-            unique_tickets = []
-            processed_in_batch = set()
-            
-            for group in similar_groups:
-                # Sort by modified time, keep the most recent
-                latest_ticket = max(group, key=lambda t: t.modified_time)
-                unique_tickets.append(latest_ticket)
-                
-                # Mark others as duplicates in database
-                for ticket in group:
-                    if ticket.id != latest_ticket.id:
-                        processed_in_batch.add(ticket.id)
-                        await self._log_duplicate(db, ticket, latest_ticket.id)
-            
-            # Add tickets that weren't part of any similar group
-            for ticket in new_tickets:
-                if ticket.id not in processed_in_batch and not any(
-                    ticket.id in [t.id for t in group] for group in similar_groups
-                ):
-                    unique_tickets.append(ticket)
-            
-            return unique_tickets
-            
-        finally:
-            db.close()
+        # Filter out already processed tickets
+        new_tickets = [t for t in tickets if t.id not in processed_ids]
+        
+        # Cluster similar tickets within the current batch
+        clusters = self.categorization_service.cluster_similar_tickets(new_tickets)
+        
+        # Keep only the most recent ticket from each cluster, marking the others as duplicates
+        unique_tickets = []
+        for ticket in new_tickets:
+            latest_ticket = clusters.representative(ticket.id)
+            if latest_ticket.id == ticket.id:
+                unique_tickets.append(ticket)
+            else:
+                await self._log_duplicate(ticket, latest_ticket.id)
+        
+        # Drop repeats of tickets handled in earlier runs
+        if settings.similarity_index_enabled:
+            earlier = self.categorization_service.similarity_index.find_duplicates(unique_tickets)
+            for ticket in unique_tickets:
+                if ticket.id in earlier:
+                    await self._log_duplicate(ticket, earlier[ticket.id])
+            unique_tickets = [ticket for ticket in unique_tickets if ticket.id not in earlier]
+        
+        # Catch near-identical text among created tickets that still have a SyncLog row
+        if settings.simhash_dedup_enabled:
+            near = self.simhash_lookup.find_near_duplicates(unique_tickets)
+            for ticket in unique_tickets:
+                if ticket.id in near:
+                    await self._log_duplicate(ticket, near[ticket.id])
+            unique_tickets = [ticket for ticket in unique_tickets if ticket.id not in near]
+        
+        return unique_tickets
     
-    async def _process_tickets(self, tickets: List[ZohoTicket], categorizations: Dict[str, str]) -> List[ProcessedTicket]:
-        """Process tickets with retry logic"""
-        results = []
+    def _build_processed_tickets(self, tickets: List[ZohoTicket], categorizations: Dict[str, str]) -> List[ProcessedTicket]:
+        """Attach category and team to each ticket"""
+        processed_tickets = []
         
         for ticket in tickets:
             category = categorizations[ticket.id]
             team = settings.category_to_team_mapping[category]
             
-            processed_ticket = ProcessedTicket(
+            processed_tickets.append(ProcessedTicket(
                 zoho_ticket=ticket,
                 category=category,
                 team=team,
                 processing_status=ProcessingStatus.PENDING
-            )
-            
-            # Process with retry logic
-            success = await self._process_single_ticket_with_retry(processed_ticket)
-            
-            if success:
-                processed_ticket.processing_status = ProcessingStatus.SUCCESS
-            else:
-                processed_ticket.processing_status = ProcessingStatus.FAILED
-            
-            results.append(processed_ticket)
-            
-            # Log to database
-            await self._log_processing_result(processed_ticket)
+            ))
+        
+        return processed_tickets
+    
+    async def _process_one(self, processed_ticket: ProcessedTicket, sync_run_id: Optional[int] = None) -> ProcessedTicket:
+        """Create the ClickUp task for one ticket and log the outcome"""
+        # With the retry queue, a failing ticket gets one attempt here and is retried in the background
+        use_queue = settings.retry_queue_enabled and settings.max_retries > 0
+        
+        # Process with retry logic (the pipeline's worker count bounds concurrent ClickUp calls)
+        success = await self._process_single_ticket_with_retry(
+            processed_ticket, max_retries=0 if use_queue else None, sync_run_id=sync_run_id
+        )
+        
+        if success:
+            processed_ticket.processing_status = ProcessingStatus.SUCCESS
+        elif use_queue and self.retry_queue.enqueue(processed_ticket, processed_ticket.error_message):
+            processed_ticket.processing_status = ProcessingStatus.RETRYING
+        else:
+            processed_ticket.processing_status = ProcessingStatus.FAILED
+            self._forget_failed(processed_ticket)
         
-        return results
+        # Log to database
+        await self._log_processing_result(processed_ticket)
+        return processed_ticket
     
-    async def _process_single_ticket_with_retry(self, processed_ticket: ProcessedTicket) -> bool:
+    def _forget_failed(self, processed_ticket: ProcessedTicket):
+        """A ticket that never got a task should not mark later tickets as its duplicates"""
+        if settings.similarity_index_enabled:
+            self.categorization_service.similarity_index.remove([processed_ticket.zoho_ticket.id])
+    
+    async def _process_single_ticket_with_retry(self, processed_ticket: ProcessedTicket,
+                                                semaphore: Optional[asyncio.Semaphore] = None,
+                                                max_retries: Optional[int] = None,
+                                                sync_run_id: Optional[int] = None) -> bool:
         """Process a single ticket with retry logic"""
-        max_retries = settings.max_retries
+        if max_retries is None:
+            max_retries = settings.max_retries
+        
+        # A task created before a crash (or before an unlogged result) is reused, never created twice
+        existing_task_id = self.task_records.task_for(processed_ticket.zoho_ticket.id)
+        if existing_task_id:
+            processed_ticket.clickup_task_id = existing_task_id
+            logger.info(f"Ticket {processed_ticket.zoho_ticket.id} already has ClickUp task {existing_task_id}")
+            return True
         
         for attempt in range(max_retries + 1):
             try:
                 # Create ClickUp task
-                task_id = await self.clickup_service.create_task(processed_ticket)
+                async with semaphore or contextlib.nullcontext():
+                    task_id = await self.clickup_service.create_task(processed_ticket)
                 processed_ticket.clickup_task_id = task_id
+                if task_id:
+                    self.task_records.record(processed_ticket.zoho_ticket.id, task_id, sync_run_id)
                 
                 logger.info(f"Successfully processed ticket {processed_ticket.zoho_ticket.id} -> ClickUp task {task_id}")
                 return True
@@ -163,6 +438,7 @@ class AutomationService:
                 processed_ticket.error_message = error_msg
                 
                 if attempt < max_retries:
+                    self.retry_attempts += 1
                     wait_time = 2 ** attempt  # Exponential backoff
                     logger.warning(f"Attempt {attempt + 1} failed for ticket {processed_ticket.zoho_ticket.id}: {error_msg}. Retrying in {wait_time}s...")
                     await asyncio.sleep(wait_time)
@@ -171,47 +447,75 @@ class AutomationService:
         
         return False
     
-    async def _log_processing_result(self, processed_ticket: ProcessedTicket):
-        """Log processing result to database"""
-        db = next(get_db())
+    async def drain_retry_queue(self) -> Dict:
+        """Retry queued tickets whose backoff has elapsed"""
+        items = self.retry_queue.due_items(limit=settings.retry_drain_batch_size)
+        stats = {"retried": len(items), "success": 0, "failed": 0, "requeued": 0}
+        if not items:
+            return stats
         
-        try:
-            log_entry = SyncLog(
-                zoho_ticket_id=processed_ticket.zoho_ticket.id,
-                clickup_task_id=processed_ticket.clickup_task_id,
-                category=processed_ticket.category,
-                team=processed_ticket.team,
-                status=processed_ticket.processing_status.value,
-                error_message=processed_ticket.error_message
-            )
+        semaphore = asyncio.Semaphore(max(1, settings.max_concurrency))
+        
+        async def retry(item) -> ProcessedTicket:
+            processed_ticket = ProcessedTicket.model_validate_json(item.payload)
+            attempts = item.attempts + 1
             
-            db.add(log_entry)
-            db.commit()
+            if await self._process_single_ticket_with_retry(processed_ticket, semaphore, max_retries=0):
+                processed_ticket.processing_status = ProcessingStatus.SUCCESS
+                processed_ticket.error_message = None
+                self.retry_queue.remove(item.zoho_ticket_id)
+                stats["success"] += 1
+            elif attempts > settings.max_retries:
+                processed_ticket.processing_status = ProcessingStatus.FAILED
+                self.retry_queue.remove(item.zoho_ticket_id)
+                self._forget_failed(processed_ticket)
+                logger.error(f"Giving up on ticket {item.zoho_ticket_id} after {attempts} attempts: {processed_ticket.error_message}")
+                stats["failed"] += 1
+            else:
+                processed_ticket.processing_status = ProcessingStatus.RETRYING
+                self.retry_queue.enqueue(processed_ticket, processed_ticket.error_message, attempts=attempts)
+                stats["requeued"] += 1
             
-        except Exception as e:
-            logger.error(f"Failed to log processing result: {str(e)}")
-            db.rollback()
-        finally:
-            db.close()
+            await self._log_processing_result(processed_ticket, self.retry_log_writer)
+            return processed_ticket
+        
+        async with self.retry_log_writer:
+            await asyncio.gather(*(retry(item) for item in items))
+        
+        logger.info(f"Retry queue: {stats['retried']} retried, {stats['success']} succeeded, "
+                    f"{stats['requeued']} requeued, {stats['failed']} gave up")
+        return stats
+    
+    async def _log_processing_result(self, processed_ticket: ProcessedTicket, writer: Optional[SyncLogWriter] = None):
+        """Log processing result to database"""
+        # A ticket keeps one row across retries and re-syncs
+        (writer or self.sync_log_writer).add(dict(
+            zoho_ticket_id=processed_ticket.zoho_ticket.id,
+            clickup_task_id=processed_ticket.clickup_task_id,
+            category=processed_ticket.category,
+            team=processed_ticket.team,
+            status=processed_ticket.processing_status.value,
+            error_message=processed_ticket.error_message,
+            **sync_log_simhash_columns(processed_ticket.zoho_ticket)
+        ))
     
-    async def _log_duplicate(self, db: Session, duplicate_ticket: ZohoTicket, original_ticket_id: str):
+    async def _log_duplicate(self, duplicate_ticket: ZohoTicket, original_ticket_id: str):
         """Log duplicate ticket"""
-        try:
-            log_entry = SyncLog(
-                zoho_ticket_id=duplicate_ticket.id,
-                clickup_task_id=None,
-                category="Duplicate",
-                team="N/A",
-                status=ProcessingStatus.DUPLICATE.value,
-                error_message=f"Duplicate of ticket {original_ticket_id}"
-            )
-            
-            db.add(log_entry)
-            db.commit()
-            
-        except Exception as e:
-            logger.error(f"Failed to log duplicate: {str(e)}")
-            db.rollback()
+        self.duplicates_logged += 1
+        self.sync_log_writer.add(dict(
+            zoho_ticket_id=duplicate_ticket.id,
+            clickup_task_id=None,
+            category="Duplicate",
+            team="N/A",
+            status=ProcessingStatus.DUPLICATE.value,
+            error_message=f"Duplicate of ticket {original_ticket_id}",
+            **sync_log_simhash_columns(duplicate_ticket)
+        ))
+    
+    def _remember_logged(self, rows: List[Dict]):
+        """Once rows are written, let the processed-id cache skip those tickets"""
+        done = (ProcessingStatus.SUCCESS.value, ProcessingStatus.DUPLICATE.value)
+        self.processed_ids.remember(row["zoho_ticket_id"] for row in rows if row["status"] in done)
     
     async def get_sync_history(self, limit: int = 50) -> List[SyncLog]:
         """Get recent sync history"""
@@ -224,26 +528,14 @@ class AutomationService:
     
     async def _log_sync_result(self, ticket_id: str, task_id: Optional[str], category: str, team: str, status: str, error_message: Optional[str] = None):
         """Log sync result to database"""
-        db = next(get_db())
-        
-        try:
-            log_entry = SyncLog(
-                zoho_ticket_id=ticket_id,
-                clickup_task_id=task_id,
-                category=category,
-                team=team,
-                status=status,
-                error_message=error_message
-            )
-            
-            db.add(log_entry)
-            db.commit()
-            
-        except Exception as e:
-            logger.error(f"Failed to log sync result: {str(e)}")
-            db.rollback()
-        finally:
-            db.close()
+        self.sync_log_writer.add(dict(
+            zoho_ticket_id=ticket_id,
+            clickup_task_id=task_id,
+            category=category,
+            team=team,
+            status=status,
+            error_message=error_message
+        ))
 
     async def get_stats(self) -> Dict:
         """Get processing statistics"""
@@ -254,6 +546,7 @@ class AutomationService:
             successful = db.query(SyncLog).filter(SyncLog.status == ProcessingStatus.SUCCESS.value).count()
             failed = db.query(SyncLog).filter(SyncLog.status == ProcessingStatus.FAILED.value).count()
             duplicates = db.query(SyncLog).filter(SyncLog.status == ProcessingStatus.DUPLICATE.value).count()
+            retrying = db.query(SyncLog).filter(SyncLog.status == ProcessingStatus.RETRYING.value).count()
             
             # Category breakdown
             category_stats = {}
@@ -266,6 +559,7 @@ class AutomationService:
                 "successful": successful,
                 "failed": failed,
                 "duplicates": duplicates,
+                "retrying": retrying,
                 "success_rate": (successful / total_processed * 100) if total_processed > 0 else 0,
                 "category_breakdown": category_stats
             }
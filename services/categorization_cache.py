@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from loguru import logger
+
+from models import CategorizationCacheEntry
+from database import get_db, chunked
+
+class CategorizationCache:
+    """Bounded LRU cache of categorization results keyed by ticket content"""
+    
+    def __init__(self, max_size: int = 10000, ttl_seconds: int = 86400, persist: bool = False):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(content_hash: str, kb_fingerprint: str, variant: str = "") -> str:
+        """Build a cache key from a ticket's content hash, the knowledge base version and the scoring settings"""
+        # The content hash covers exactly the text the scorer sees, so a hit is always exact
+        return f"{kb_fingerprint}:{variant}:{content_hash}"
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached category, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                category, stored_at = entry
+                if time.monotonic() - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return category
+                del self._entries[key]
+        
+        if self.persist:
+            category = self._load_persisted(key)
+            if category is not None:
+                with self._lock:
+                    self._remember(key, category)
+                    self.hits += 1
+                return category
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Cached categories for the keys that have one, with a single database lookup for all in-memory misses"""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, str] = {}
+        missing = []
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[1] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[0]
+                    continue
+                if entry is not None:
+                    del self._entries[key]
+                missing.append(key)
+        
+        if self.persist and missing:
+            persisted = self._load_persisted_many(missing)
+            with self._lock:
+                for key, category in persisted.items():
+                    self._remember(key, category)
+            found.update(persisted)
+        
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+    
+    def put(self, key: str, category: str):
+        """Cache the category for a key"""
+        self.put_many({key: category})
+    
+    def put_many(self, entries: Dict[str, str]):
+        """Cache several categories at once"""
+        if not entries:
+            return
+        
+        with self._lock:
+            for key, category in entries.items():
+                self._remember(key, category)
+        
+        if self.persist:
+            self._store_persisted(entries)
+    
+    def _remember(self, key: str, category: str):
+        """Insert into the in-memory LRU, evicting the oldest entries (lock held)"""
+        self._entries[key] = (category, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def _load_persisted(self, key: str) -> Optional[str]:
+        """Look up a non-expired entry in the database"""
+        db = next(get_db())
+        try:
+            entry = db.query(CategorizationCacheEntry).filter(
+                CategorizationCacheEntry.cache_key == key,
+                CategorizationCacheEntry.created_at >= datetime.now() - timedelta(seconds=self.ttl_seconds)
+            ).first()
+            return entry.category if entry else None
+        except Exception as e:
+            logger.error(f"Error reading categorization cache: {str(e)}")
+            return None
+        finally:
+            db.close()
+    
+    def _load_persisted_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Look up non-expired entries for many keys in the database"""
+        db = next(get_db())
+        try:
+            cutoff = datetime.now() - timedelta(seconds=self.ttl_seconds)
+            found = {}
+            for chunk in chunked(list(keys)):
+                found.update(db.query(CategorizationCacheEntry.cache_key, CategorizationCacheEntry.category).filter(
+                    CategorizationCacheEntry.cache_key.in_(chunk),
+                    CategorizationCacheEntry.created_at >= cutoff
+                ).all())
+            return found
+        except Exception as e:
+            logger.error(f"Error reading categorization cache: {str(e)}")
+            return {}
+        finally:
+            db.close()
+    
+    def _store_persisted(self, entries: Dict[str, str]):
+        """Write entries to the database in one transaction"""
+        db = next(get_db())
+        try:
+            now = datetime.now()
+            for key, category in entries.items():
+                db.merge(CategorizationCacheEntry(cache_key=key, category=category, created_at=now))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error writing categorization cache: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+    
+    def purge_expired(self) -> int:
+        """Delete expired persisted entries and return how many were removed"""
+        if not self.persist:
+            return 0
+        
+        db = next(get_db())
+        try:
+            deleted = db.query(CategorizationCacheEntry).filter(
+                CategorizationCacheEntry.created_at < datetime.now() - timedelta(seconds=self.ttl_seconds)
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        except Exception as e:
+            logger.error(f"Error purging categorization cache: {str(e)}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+    
+    def clear(self):
+        """Drop every in-memory entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict:
+        """Get hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups * 100) if lookups > 0 else 0
+            }
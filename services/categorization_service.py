@@ -1,83 +1,278 @@
-import re
-from typing import List, Dict, Tuple
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, FrozenSet
 from loguru import logger
 from models import ZohoTicket, TicketCategory
 from services.knowledge_base_service import KnowledgeBaseService
+from services.keyword_matcher import KeywordMatcher, init_worker, score_chunk, runner_up_matches
+from services.categorization_cache import CategorizationCache
+from services.tfidf_classifier import TfidfCentroidClassifier
+from services.ticket_normalizer import normalize_ticket
+from services.duplicate_detection import MinHashLSH, BlockingIndex, TicketClusters, SAME_REPORTER_BOOST
+from services.similarity_index import SimilarityIndex
+from services.ngram_similarity import NgramSimilarityEngine
+from config import settings
+
+try:
+    import numpy as np
+except ImportError:  # Batches are scored ticket by ticket without NumPy
+    np = None
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+
+def cascade_training_path() -> Path:
+    """CASCADE_TRAINING_CSV, with a relative path taken from the repository root rather than the working directory"""
+    path = Path(settings.cascade_training_csv)
+    return path if path.is_absolute() else _REPO_ROOT / path
 
 class CategorizationService:
     def __init__(self):
         self.kb_service = KnowledgeBaseService()
+        self.matcher = None
+        self.rules_version = None
+        self.rules_fingerprint = None
+        self.cache = CategorizationCache(
+            max_size=settings.categorization_cache_size,
+            ttl_seconds=settings.categorization_cache_ttl_seconds,
+            persist=settings.categorization_cache_persist
+        )
+        self._executor = None
+        self._executor_version = None
+        self._classifier = None
+        self._classifier_version = None
+        self._training_fingerprint = None  # ((mtime, size), digest) of the cascade training CSV
+        self.cascade_stats = {"keyword_stage": 0, "second_stage": 0, "changed": 0, "uncovered": 0, "unavailable": 0}
+        self.lsh = MinHashLSH(bands=settings.lsh_bands, rows=settings.lsh_rows)
+        self.similarity_stats: Dict = {}
+        self.similarity_index = SimilarityIndex(self.lsh, retention_days=settings.similarity_index_retention_days)
+        self._ngram_engine = None
         self.category_rules = self._load_categorization_rules()
     
     def _load_categorization_rules(self) -> Dict[str, Dict]:
-        """Load categorization rules from database"""
-        return self.kb_service.get_categorization_rules()
+        """Load categorization rules from the knowledge base snapshot"""
+        snapshot = self.kb_service.get_snapshot()
+        
+        # Only recompile the keyword automaton when the knowledge base version changed
+        if self.matcher is None or snapshot.version != self.rules_version:
+            self.matcher = snapshot.matcher or self._build_matcher(snapshot.rules)
+            self.rules_version = snapshot.version
+            self.rules_fingerprint = snapshot.fingerprint
+        
+        return snapshot.rules
+    
+    def _build_matcher(self, rules: Dict[str, Dict]) -> KeywordMatcher:
+        """Compile rules, patching the current matcher when only some categories changed"""
+        changed = self.kb_service.get_changes_since(self.rules_version) if self.matcher is not None else None
+        
+        if changed is not None:
+            try:
+                matcher = self.matcher.updated(rules, changed)
+                logger.info(f"Incrementally updated keyword matcher for {len(changed)} categories")
+                return matcher
+            except Exception as e:
+                logger.warning(f"Incremental matcher update failed, rebuilding: {str(e)}")
+        
+        return KeywordMatcher(rules)
     
     def categorize_ticket(self, ticket: ZohoTicket) -> str:
         """Categorize a ticket based on its content"""
         try:
-            # Reload rules to get latest from database
+            # Pick up the latest rule snapshot (at most a version check every KB_VERSION_POLL_SECONDS)
             self.category_rules = self._load_categorization_rules()
             
-            # Combine subject and description for analysis
-            text_content = f"{ticket.subject} {ticket.description}".lower()
-            
-            # Calculate scores for each category
-            category_scores = {}
+            cache_key = self._cache_key(ticket)
+            category = self.cache.get(cache_key)
+            if category is not None:
+                logger.info(f"Ticket {ticket.id} categorized as {category} (cached)")
+                return category
             
-            for category, category_data in self.category_rules.items():
-                rules = category_data.get("rules", [])
-                score = self._calculate_category_score(text_content, rules)
-                category_scores[category] = score
-            
-            # Find the category with the highest score
-            if category_scores:
-                best_category = max(category_scores, key=category_scores.get)
-                best_score = category_scores[best_category]
-                
-                # If no category has a significant score, default to Learning Portal Issues
-                if best_score < 5:
-                    logger.info(f"Ticket {ticket.id} defaulted to Learning Portal Issues (score: {best_score})")
-                    return "Learning Portal Issues"
-                
-                logger.info(f"Ticket {ticket.id} categorized as {best_category} (score: {best_score})")
-                return best_category
-            else:
-                logger.info(f"Ticket {ticket.id} defaulted to Learning Portal Issues (no rules)")
-                return "Learning Portal Issues"
+            category = self._categorize_uncached(ticket)
+            self.cache.put(cache_key, category)
+            return category
             
         except Exception as e:
             logger.error(f"Error categorizing ticket {ticket.id}: {str(e)}")
             return "Learning Portal Issues"
     
-    def _calculate_category_score(self, text: str, rules: List[Dict]) -> float:
-        """Calculate score for a category based on pattern matching"""
-        total_score = 0
+    def _cache_key(self, ticket: ZohoTicket, variant: Optional[str] = None) -> str:
+        """Cache key for a ticket under the current knowledge base version and scoring settings"""
+        if variant is None:
+            variant = self._cache_variant()
+        return CategorizationCache.make_key(normalize_ticket(ticket).content_hash, self.rules_fingerprint, variant)
+    
+    def _cache_variant(self) -> str:
+        """The settings besides the rules that decide a ticket's category"""
+        if not settings.categorization_cascade_enabled:
+            return "keyword"
+        return f"cascade-{settings.cascade_margin}-{settings.cascade_min_similarity}-{self._training_data_fingerprint()}"
+    
+    def _training_data_fingerprint(self) -> str:
+        """Content hash of the cascade training CSV, recomputed only when the file changes"""
+        path = cascade_training_path()
+        try:
+            stat = path.stat()
+        except OSError:
+            return "none"
         
-        for rule in rules:
-            patterns = rule["patterns"]
-            weight = rule["weight"]
-            
-            # Count pattern matches
-            matches = 0
-            for pattern in patterns:
-                # Use word boundaries for more accurate matching
-                pattern_regex = r'\b' + re.escape(pattern) + r'\b'
-                matches += len(re.findall(pattern_regex, text, re.IGNORECASE))
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        if self._training_fingerprint is None or self._training_fingerprint[0] != file_key:
+            self._training_fingerprint = (file_key, hashlib.sha1(path.read_bytes()).hexdigest()[:12])
+        return self._training_fingerprint[1]
+    
+    def _categorize_uncached(self, ticket: ZohoTicket) -> str:
+        """Score a ticket against the current rules"""
+        # Lowercased subject and description, computed once per ticket
+        text_content = normalize_ticket(ticket).text
+        
+        # Score every category in a single pass over the text
+        category_scores = self.matcher.score(text_content)
+        
+        if not category_scores:
+            logger.info(f"Ticket {ticket.id} defaulted to Learning Portal Issues (no rules)")
+            return "Learning Portal Issues"
+        
+        # Find the category with the highest score
+        best_category = max(category_scores, key=category_scores.get)
+        best_score = category_scores[best_category]
+        
+        # If no category has a significant score, default to Learning Portal Issues
+        if best_score < 5:
+            logger.info(f"Ticket {ticket.id} defaulted to Learning Portal Issues (score: {best_score})")
+            category = "Learning Portal Issues"
+        else:
+            logger.info(f"Ticket {ticket.id} categorized as {best_category} (score: {best_score})")
+            category = best_category
+        
+        if settings.categorization_cascade_enabled:
+            runner_up_category = max((name for name in category_scores if name != best_category),
+                                     key=category_scores.get, default=None)
+            runner_up = category_scores[runner_up_category] if runner_up_category is not None else 0
+            if self._is_ambiguous(best_score, runner_up):
+                contenders = [(best_category, best_score), (runner_up_category, runner_up)]
+                return self._second_stage(ticket.id, text_content, category, contenders)
+            self.cascade_stats["keyword_stage"] += 1
+        
+        return category
+    
+    def _is_ambiguous(self, best_score: float, runner_up_score: float) -> bool:
+        """Whether a keyword result is too weak or too close to call (a ticket no keyword matched has nothing to settle)"""
+        return best_score > 0 and (best_score < 5 or best_score - runner_up_score < settings.cascade_margin)
+    
+    def _get_classifier(self) -> Optional[TfidfCentroidClassifier]:
+        """Get the TF-IDF classifier trained against the current categories and training data"""
+        version = (self.rules_version, self._training_data_fingerprint())
+        if self._classifier_version != version:
+            self._classifier_version = version
+            self._classifier = None
+            training_csv = cascade_training_path()
+            if not training_csv.is_file():
+                logger.warning(f"Categorization cascade is enabled but its training data {training_csv} is missing; "
+                               f"ambiguous tickets keep their keyword result")
+                return None
             
-            # Apply weight to matches
-            rule_score = matches * weight
-            total_score += rule_score
+            try:
+                classifier = TfidfCentroidClassifier.from_csv(str(training_csv), self.matcher.categories)
+                if not classifier.categories:
+                    logger.warning(f"Training data {training_csv} has no issues labelled with a knowledge base "
+                                   f"category; ambiguous tickets keep their keyword result")
+                    return None
+                self._classifier = classifier
+                uncovered = sorted(set(self.matcher.categories) - set(self._classifier.categories))
+                if uncovered:
+                    logger.info(f"TF-IDF second stage has no training data for {len(uncovered)} categories "
+                                f"({', '.join(uncovered)}); ties involving them keep the keyword result")
+            except Exception as e:
+                logger.warning(f"TF-IDF second stage unavailable: {str(e)}")
+                self._classifier = None
+        return self._classifier
+    
+    def _second_stage(self, ticket_id: str, text_content: str, keyword_category: str,
+                      contenders: List[Tuple[Optional[str], float]]) -> str:
+        """Settle an ambiguous ticket between its top two keyword categories with the nearest TF-IDF centroid"""
+        classifier = self._get_classifier()
+        if classifier is None:
+            self.cascade_stats["unavailable"] += 1
+            return keyword_category
+        
+        # Only decide between two categories that both matched and both have training data
+        candidates = [name for name, score in contenders if name is not None and score > 0]
+        if len(candidates) < 2 or not set(candidates) <= set(classifier.categories):
+            self.cascade_stats["uncovered"] += 1
+            return keyword_category
+        
+        self.cascade_stats["second_stage"] += 1
+        category, similarity = classifier.predict(text_content, candidates)
+        if category is None or similarity < settings.cascade_min_similarity:
+            return keyword_category
         
-        return total_score
+        if category != keyword_category:
+            self.cascade_stats["changed"] += 1
+            logger.info(f"Ticket {ticket_id} recategorized from {keyword_category} to {category} "
+                        f"by TF-IDF (similarity: {similarity:.2f})")
+        return category
     
-    def batch_categorize(self, tickets: List[ZohoTicket]) -> Dict[str, str]:
+    def get_cascade_stats(self) -> Dict:
+        """Get how many tickets each cascade stage decided.
+        
+        second_stage counts tickets the classifier actually scored; ambiguous
+        tickets it could not settle are counted as uncovered (a top-two
+        category without training data) or unavailable (no classifier) and
+        keep their keyword result.
+        """
+        routed = sum(self.cascade_stats[stage] for stage in ("keyword_stage", "second_stage", "uncovered", "unavailable"))
+        return {
+            **self.cascade_stats,
+            "second_stage_ratio": (self.cascade_stats["second_stage"] / routed * 100) if routed > 0 else 0
+        }
+    
+    def batch_categorize(self, tickets: List[ZohoTicket], parallel: Optional[bool] = None) -> Dict[str, str]:
         """Categorize multiple tickets and return mapping"""
-        categorizations = {}
+        self.category_rules = self._load_categorization_rules()
         
+        # Serve repeated ticket content from the cache and only score the rest
+        variant = self._cache_variant()
+        cache_keys = {ticket.id: self._cache_key(ticket, variant) for ticket in tickets}
+        cached = self.cache.get_many(cache_keys.values())
+        categorizations = {}
+        uncached = []
         for ticket in tickets:
-            category = self.categorize_ticket(ticket)
-            categorizations[ticket.id] = category
+            category = cached.get(cache_keys[ticket.id])
+            if category is not None:
+                categorizations[ticket.id] = category
+            else:
+                uncached.append(ticket)
+        
+        scored = None
+        
+        if parallel is None:
+            parallel = len(uncached) >= settings.parallel_batch_threshold and self._worker_count() > 1
+        
+        if parallel and uncached:
+            try:
+                scored = self._batch_categorize_parallel(uncached)
+            except Exception as e:
+                logger.warning(f"Parallel categorization failed, scoring in process: {str(e)}")
+                self.close()
+        
+        if scored is None and np is not None and uncached and len(uncached) >= settings.vectorized_batch_threshold:
+            try:
+                scored = self._batch_categorize_vectorized(uncached)
+            except Exception as e:
+                logger.warning(f"Vectorized categorization failed, scoring tickets one by one: {str(e)}")
+        
+        if scored is None:
+            scored = {}
+            for ticket in uncached:
+                try:
+                    scored[ticket.id] = self._categorize_uncached(ticket)
+                except Exception as e:
+                    logger.error(f"Error categorizing ticket {ticket.id}: {str(e)}")
+                    categorizations[ticket.id] = "Learning Portal Issues"
+        
+        self.cache.put_many({cache_keys[ticket_id]: category for ticket_id, category in scored.items()})
+        categorizations.update(scored)
         
         # Log categorization summary
         category_counts = {}
@@ -88,8 +283,119 @@ class CategorizationService:
         for category, count in category_counts.items():
             logger.info(f"  {category}: {count} tickets")
         
+        if settings.categorization_cascade_enabled:
+            cascade_stats = self.get_cascade_stats()
+            logger.info(f"Cascade routing: {cascade_stats['second_stage_ratio']:.1f}% of scored tickets sent to TF-IDF "
+                        f"({cascade_stats['changed']} recategorized, {cascade_stats['uncovered']} ambiguous but not covered "
+                        f"by its training data)")
+        
+        cache_stats = self.cache.stats()
+        logger.info(f"Categorization cache: {len(tickets) - len(uncached)} of {len(tickets)} tickets served from cache "
+                    f"({cache_stats['hits']} hits, {cache_stats['misses']} misses overall)")
+        
+        return categorizations
+    
+    def _batch_categorize_vectorized(self, tickets: List[ZohoTicket]) -> Dict[str, str]:
+        """Score a whole batch as one ticket-by-keyword times keyword-by-category product"""
+        if not self.matcher.categories:
+            logger.info(f"{len(tickets)} tickets defaulted to Learning Portal Issues (no rules)")
+            return {ticket.id: "Learning Portal Issues" for ticket in tickets}
+        
+        texts = [normalize_ticket(ticket).text for ticket in tickets]
+        scores = self.matcher.score_matrix(texts)
+        
+        # argmax keeps the first category on ties, like max() over the score dict
+        best_index = scores.argmax(axis=1)
+        best_score = scores[np.arange(len(tickets)), best_index]
+        
+        # Low-scoring tickets map to the extra "Learning Portal Issues" slot at the end
+        labels = np.array(self.matcher.categories + ["Learning Portal Issues"], dtype=object)
+        chosen = np.where(best_score < 5, len(self.matcher.categories), best_index)
+        
+        logger.info(f"Vectorized categorization of {len(tickets)} tickets ({int((best_score < 5).sum())} defaulted)")
+        categorizations = {ticket.id: category for ticket, category in zip(tickets, labels[chosen].tolist())}
+        
+        if settings.categorization_cascade_enabled:
+            runner_up_index, runner_up = runner_up_matches(scores, best_index)
+            ambiguous = (best_score > 0) & ((best_score < 5) | (best_score - runner_up < settings.cascade_margin))
+            self.cascade_stats["keyword_stage"] += int(len(tickets) - ambiguous.sum())
+            categories = self.matcher.categories
+            for row in np.flatnonzero(ambiguous).tolist():
+                ticket_id = tickets[row].id
+                contenders = [(categories[best_index[row]], best_score[row])]
+                if runner_up_index[row] >= 0:
+                    contenders.append((categories[runner_up_index[row]], runner_up[row]))
+                categorizations[ticket_id] = self._second_stage(
+                    ticket_id, texts[row], categorizations[ticket_id], contenders
+                )
+        
+        return categorizations
+    
+    def _worker_count(self) -> int:
+        """Number of worker processes for parallel categorization"""
+        return settings.categorization_workers or os.cpu_count() or 1
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get a process pool whose workers hold the current compiled matcher"""
+        if self._executor is not None and self._executor_version != self.rules_version:
+            self.close()
+        
+        if self._executor is None:
+            # The matcher is shipped to each worker once, when the worker starts
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._worker_count(),
+                initializer=init_worker,
+                initargs=(self.matcher,)
+            )
+            self._executor_version = self.rules_version
+        
+        return self._executor
+    
+    def _batch_categorize_parallel(self, tickets: List[ZohoTicket]) -> Dict[str, str]:
+        """Split a large batch into chunks scored across worker processes"""
+        executor = self._get_executor()
+        
+        texts = [normalize_ticket(ticket).text for ticket in tickets]
+        chunk_size = max(settings.categorization_chunk_size, 1)
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        
+        matches = []
+        for chunk_matches in executor.map(score_chunk, chunks):
+            matches.extend(chunk_matches)
+        
+        categories = self.matcher.categories
+        categorizations = {}
+        for ticket, text_content, (best_index, best_score, runner_up_index, runner_up) in zip(tickets, texts, matches):
+            if best_index < 0 or best_score < 5:
+                category = "Learning Portal Issues"
+            else:
+                category = categories[best_index]
+            
+            if settings.categorization_cascade_enabled and best_index >= 0:
+                if self._is_ambiguous(best_score, runner_up):
+                    contenders = [(categories[best_index], best_score)]
+                    if runner_up_index >= 0:
+                        contenders.append((categories[runner_up_index], runner_up))
+                    category = self._second_stage(ticket.id, text_content, category, contenders)
+                else:
+                    self.cascade_stats["keyword_stage"] += 1
+            
+            categorizations[ticket.id] = category
+        
+        logger.info(f"Parallel categorization of {len(tickets)} tickets in {len(chunks)} chunks")
         return categorizations
     
+    def get_cache_stats(self) -> Dict:
+        """Get categorization cache hit/miss counters"""
+        return self.cache.stats()
+    
+    def close(self):
+        """Shut down the categorization worker pool, if one was started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._executor_version = None
+    
     def get_team_for_category(self, category: str) -> str:
         """Get team assignment for a category"""
         return self.kb_service.get_team_for_category(category)
@@ -116,35 +422,136 @@ class CategorizationService:
     
     def get_similar_tickets(self, tickets: List[ZohoTicket], similarity_threshold: float = 0.8) -> List[List[ZohoTicket]]:
         """Group similar tickets together for potential merging"""
-        similar_groups = []
-        processed_tickets = set()
+        return self.cluster_similar_tickets(tickets, similarity_threshold).groups()
+    
+    def cluster_similar_tickets(self, tickets: List[ZohoTicket], similarity_threshold: float = 0.8) -> TicketClusters:
+        """Cluster tickets so every pair at or above the threshold ends up together"""
+        if settings.duplicate_detection_method == "ngram" and self._get_ngram_engine() is not None:
+            return self._cluster_by_ngrams(tickets, similarity_threshold)
+        
+        clusters = TicketClusters(tickets)
+        compared = 0
+        
+        # Only pairs that can plausibly reach the threshold are compared
+        neighbours = self._candidate_neighbours(tickets, similarity_threshold)
         
         for i, ticket1 in enumerate(tickets):
-            if ticket1.id in processed_tickets:
-                continue
-            
-            similar_group = [ticket1]
-            processed_tickets.add(ticket1.id)
-            
-            for j, ticket2 in enumerate(tickets[i+1:], i+1):
-                if ticket2.id in processed_tickets:
+            for j in neighbours(i):
+                # Already in one cluster, so this pair cannot change anything
+                if clusters.find(i) == clusters.find(j):
                     continue
                 
-                similarity = self._calculate_similarity(ticket1, ticket2)
-                if similarity >= similarity_threshold:
-                    similar_group.append(ticket2)
-                    processed_tickets.add(ticket2.id)
-            
-            if len(similar_group) > 1:
-                similar_groups.append(similar_group)
-                logger.info(f"Found {len(similar_group)} similar tickets: {[t.id for t in similar_group]}")
+                compared += 1
+                if self._calculate_similarity(ticket1, tickets[j]) >= similarity_threshold:
+                    clusters.union(i, j)
+        
+        groups = clusters.groups()
+        for group in groups:
+            logger.info(f"Found {len(group)} similar tickets: {[t.id for t in group]}")
         
-        return similar_groups
+        self.similarity_stats["compared_pairs"] = compared
+        self.similarity_stats["clusters"] = len(groups)
+        total_pairs = self.similarity_stats.get("total_pairs", 0)
+        candidate_pairs = self.similarity_stats.get("candidate_pairs", 0)
+        pruned = 1 - candidate_pairs / total_pairs if total_pairs else 0.0
+        logger.info(f"Similarity check: {candidate_pairs} candidate pairs of {total_pairs} possible "
+                    f"({pruned:.1%} pruned), {compared} compared ({settings.duplicate_detection_method})")
+        
+        return clusters
+    
+    def _cluster_by_ngrams(self, tickets: List[ZohoTicket], similarity_threshold: float) -> TicketClusters:
+        """Cluster on character n-gram cosine of subjects, which tolerates typos"""
+        clusters = TicketClusters(tickets)
+        subjects = [" ".join(normalize_ticket(ticket).subject_tokens) for ticket in tickets]
+        
+        # Same-reporter pairs get the usual boost, so they may qualify from a lower cosine
+        neighbours = self._get_ngram_engine().top_k(
+            subjects, k=settings.ngram_top_k, min_similarity=similarity_threshold - SAME_REPORTER_BOOST
+        )
+        
+        candidate_pairs = 0
+        for i, ticket1 in enumerate(tickets):
+            for j, cosine in neighbours[i]:
+                candidate_pairs += 1
+                ticket2 = tickets[j]
+                if ticket1.email and ticket1.email == ticket2.email:
+                    cosine += SAME_REPORTER_BOOST
+                if min(cosine, 1.0) >= similarity_threshold:
+                    clusters.union(i, j)
+        
+        groups = clusters.groups()
+        for group in groups:
+            logger.info(f"Found {len(group)} similar tickets: {[t.id for t in group]}")
+        
+        self.similarity_stats = {
+            "total_pairs": len(tickets) * (len(tickets) - 1) // 2,
+            "candidate_pairs": candidate_pairs,
+            "compared_pairs": candidate_pairs,
+            "clusters": len(groups)
+        }
+        logger.info(f"Similarity check: {candidate_pairs} n-gram neighbour pairs "
+                    f"(top {settings.ngram_top_k} per ticket), {len(groups)} clusters (ngram)")
+        return clusters
+    
+    def _get_ngram_engine(self) -> Optional[NgramSimilarityEngine]:
+        """Get the character n-gram engine, or None when NumPy is unavailable"""
+        if self._ngram_engine is None:
+            try:
+                self._ngram_engine = NgramSimilarityEngine(
+                    n=settings.ngram_size,
+                    dimensions=settings.ngram_dimensions,
+                    block_memory_mb=settings.ngram_block_memory_mb
+                )
+            except RuntimeError as e:
+                logger.warning(f"N-gram similarity unavailable: {str(e)}")
+                self._ngram_engine = False
+        return self._ngram_engine or None
+    
+    def _candidate_neighbours(self, tickets: List[ZohoTicket], similarity_threshold: float):
+        """Return a function giving, for ticket index i, the later indices worth comparing"""
+        total_pairs = len(tickets) * (len(tickets) - 1) // 2
+        method = settings.duplicate_detection_method
+        
+        # With a non-positive threshold every pair qualifies, so nothing can be pruned
+        if method == "exhaustive" or similarity_threshold <= 0:
+            self.similarity_stats = {"total_pairs": total_pairs, "candidate_pairs": total_pairs}
+            return lambda i: range(i + 1, len(tickets))
+        
+        if method == "blocking":
+            blocking = BlockingIndex(similarity_threshold)
+            candidates, stats = blocking.candidate_pairs(
+                [normalize_ticket(ticket).subject_token_set for ticket in tickets],
+                [ticket.email for ticket in tickets]
+            )
+            self.similarity_stats = {"total_pairs": total_pairs, **stats}
+            return lambda i: candidates.get(i, [])
+        
+        # MinHash/LSH over subject words, so the estimate tracks the exact Jaccard check
+        candidates = self.lsh.candidate_pairs([normalize_ticket(ticket).subject_token_set for ticket in tickets])
+        
+        # Same-reporter pairs get a boost, so they qualify at a lower subject similarity
+        # than LSH is tuned for; bucket them by email as well
+        by_email: Dict[str, List[int]] = {}
+        for index, ticket in enumerate(tickets):
+            if ticket.email:
+                by_email.setdefault(ticket.email, []).append(index)
+        for members in by_email.values():
+            for position, first in enumerate(members[:-1]):
+                candidates[first] = sorted(set(candidates.get(first, [])).union(members[position + 1:]))
+        
+        self.similarity_stats = {
+            "total_pairs": total_pairs,
+            "candidate_pairs": sum(len(later) for later in candidates.values())
+        }
+        return lambda i: candidates.get(i, [])
     
     def _calculate_similarity(self, ticket1: ZohoTicket, ticket2: ZohoTicket) -> float:
         """Calculate similarity between two tickets"""
         # Simple similarity based on subject and email
-        subject_similarity = self._text_similarity(ticket1.subject, ticket2.subject)
+        subject_similarity = self._token_set_similarity(
+            normalize_ticket(ticket1).subject_token_set,
+            normalize_ticket(ticket2).subject_token_set
+        )
         
         # Check if same user
         same_user = ticket1.email and ticket2.email and ticket1.email == ticket2.email
@@ -152,22 +559,16 @@ class CategorizationService:
         # Combine factors
         similarity = subject_similarity
         if same_user:
-            similarity += 0.3  # Boost for same user
+            similarity += SAME_REPORTER_BOOST  # Boost for same user
         
         return min(similarity, 1.0)
     
-    def _text_similarity(self, text1: str, text2: str) -> float:
-        """Calculate text similarity using simple word overlap"""
-        if not text1 or not text2:
-            return 0.0
-        
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
+    def _token_set_similarity(self, words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+        """Jaccard similarity of two pre-tokenized word sets"""
         if not words1 or not words2:
             return 0.0
         
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
+        intersection = len(words1 & words2)
+        union = len(words1) + len(words2) - intersection
         
-        return len(intersection) / len(union) if union else 0.0
\ No newline at end of file
+        return intersection / union if union else 0.0
\ No newline at end of file
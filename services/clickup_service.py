@@ -1,9 +1,9 @@
-import requests
 import asyncio
 from typing import Optional, List
 from loguru import logger
 from config import settings
 from models import ClickUpTask, ProcessedTicket
+from services.http_client import get_http_client
 
 class ClickUpService:
     def __init__(self):
@@ -41,7 +41,7 @@ class ClickUpService:
             
             url = f"{self.base_url}/list/{list_id}/task"
             
-            response = requests.post(url, json=task_data, headers=self.headers)
+            response = await get_http_client().post(url, json=task_data, headers=self.headers)
             response.raise_for_status()
             
             task_response = response.json()
@@ -93,7 +93,7 @@ class ClickUpService:
         """Get task details from ClickUp"""
         try:
             url = f"{self.base_url}/task/{task_id}"
-            response = requests.get(url, headers=self.headers)
+            response = await get_http_client().get(url, headers=self.headers)
             response.raise_for_status()
             
             return response.json()
@@ -108,7 +108,7 @@ class ClickUpService:
             url = f"{self.base_url}/task/{task_id}"
             data = {"status": status}
             
-            response = requests.put(url, json=data, headers=self.headers)
+            response = await get_http_client().put(url, json=data, headers=self.headers)
             response.raise_for_status()
             
             logger.info(f"Updated ClickUp task {task_id} status to {status}")
@@ -124,7 +124,7 @@ class ClickUpService:
             url = f"{self.base_url}/task/{task_id}/comment"
             data = {"comment_text": comment}
             
-            response = requests.post(url, json=data, headers=self.headers)
+            response = await get_http_client().post(url, json=data, headers=self.headers)
             response.raise_for_status()
             
             logger.info(f"Added comment to ClickUp task {task_id}")
@@ -164,7 +164,7 @@ class ClickUpService:
             
             url = f"{self.base_url}/list/{list_id}/task"
             
-            response = requests.post(url, json=task_data_payload, headers=self.headers)
+            response = await get_http_client().post(url, json=task_data_payload, headers=self.headers)
             response.raise_for_status()
             
             task_response = response.json()
@@ -202,7 +202,7 @@ class ClickUpService:
         """Get all lists in the team"""
         try:
             url = f"{self.base_url}/team/{settings.clickup_team_id}/list"
-            response = requests.get(url, headers=self.headers)
+            response = await get_http_client().get(url, headers=self.headers)
             response.raise_for_status()
             
             return response.json().get("lists", [])
@@ -0,0 +1,229 @@
+import math
+import random
+import zlib
+from collections import Counter, defaultdict
+from typing import List, Dict, Tuple, Optional, FrozenSet, Iterable
+from models import ZohoTicket
+
+# Mersenne prime modulus for the MinHash permutations
+_PRIME = (1 << 61) - 1
+
+# Similarity added when two tickets come from the same reporter
+SAME_REPORTER_BOOST = 0.3
+
+
+def stable_token_hash(token: str) -> int:
+    """Process-independent hash of a token (Python's hash() is salted per process)"""
+    return zlib.crc32(token.encode("utf-8"))
+
+
+class MinHasher:
+    """MinHash signatures whose agreement rate estimates Jaccard similarity of token sets"""
+
+    def __init__(self, num_perm: int, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, tokens: Iterable[str]) -> Tuple[int, ...]:
+        """MinHash signature of a token set (empty tuple for an empty set)"""
+        hashes = [stable_token_hash(token) for token in tokens]
+        if not hashes:
+            return ()
+        return tuple(min((a * value + b) % _PRIME for value in hashes) for a, b in self._permutations)
+
+    @staticmethod
+    def estimate_similarity(signature1: Tuple[int, ...], signature2: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity from two signatures"""
+        if not signature1 or not signature2:
+            return 0.0
+        matches = sum(1 for value1, value2 in zip(signature1, signature2) if value1 == value2)
+        return matches / len(signature1)
+
+
+class MinHashLSH:
+    """Banded locality-sensitive hashing over MinHash signatures.
+
+    Signatures are cut into `bands` bands of `rows` values; two sets become a
+    candidate pair when any band matches exactly. More rows per band raises
+    precision, more bands raises recall. The similarity at which a pair has a
+    50% chance of becoming a candidate is roughly (1 / bands) ** (1 / rows).
+    """
+
+    def __init__(self, bands: int = 16, rows: int = 4, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        self.hasher = MinHasher(bands * rows, seed)
+
+    def band_keys(self, signature: Tuple[int, ...]) -> List[int]:
+        """One hash per band, usable as a bucket key (also across processes)"""
+        if not signature:
+            return []
+        keys = []
+        for band in range(self.bands):
+            values = signature[band * self.rows:(band + 1) * self.rows]
+            band_bytes = f"{band}:{','.join(map(str, values))}".encode("utf-8")
+            keys.append(zlib.crc32(band_bytes) | (band << 32))
+        return keys
+
+    def candidate_pairs(self, token_sets: List[FrozenSet[str]],
+                        signatures: Optional[List[Tuple[int, ...]]] = None) -> Dict[int, List[int]]:
+        """Map each index to the later indices it shares at least one band bucket with"""
+        if signatures is None:
+            signatures = [self.hasher.signature(tokens) for tokens in token_sets]
+
+        buckets: Dict[int, List[int]] = defaultdict(list)
+        for index, signature in enumerate(signatures):
+            for key in self.band_keys(signature):
+                buckets[key].append(index)
+
+        neighbours: Dict[int, set] = defaultdict(set)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            for position, first in enumerate(members):
+                neighbours[first].update(members[position + 1:])
+
+        return {index: sorted(later) for index, later in neighbours.items()}
+
+
+class BlockingIndex:
+    """Candidate pairs from inverted indexes on reporter email and rare subject tokens.
+
+    Subject tokens are ranked by document frequency and each ticket is only
+    indexed under its rarest ones (prefix filtering): two token sets with
+    Jaccard similarity >= threshold always share one of those tokens, so no
+    qualifying pair is lost while common words never form huge blocks. Pairs
+    that share a block are then dropped when the set sizes alone cap their
+    similarity below the threshold.
+    """
+
+    def __init__(self, threshold: float, same_reporter_boost: float = SAME_REPORTER_BOOST):
+        self.threshold = threshold
+        self.same_reporter_boost = same_reporter_boost
+
+    def prefix_length(self, size: int) -> int:
+        """How many of a set's rarest tokens to index so Jaccard >= threshold implies a shared one"""
+        if not size:
+            return 0
+        # A small tolerance keeps float rounding from shortening the prefix
+        required_overlap = max(1, math.ceil(self.threshold * size - 1e-9))
+        return max(0, size - required_overlap + 1)
+
+    def upper_bound(self, size1: int, size2: int, same_reporter: bool) -> float:
+        """Best similarity two tickets with these subject set sizes could reach"""
+        bound = min(size1, size2) / max(size1, size2) if size1 and size2 else 0.0
+        if same_reporter:
+            bound += self.same_reporter_boost
+        return min(bound, 1.0)
+
+    def candidate_pairs(self, token_sets: List[FrozenSet[str]],
+                        emails: List[Optional[str]]) -> Tuple[Dict[int, List[int]], Dict[str, int]]:
+        """Map each index to the later indices worth comparing, plus pair counts"""
+        document_frequency = Counter()
+        for tokens in token_sets:
+            document_frequency.update(tokens)
+
+        blocks: Dict[object, List[int]] = defaultdict(list)
+        for index, tokens in enumerate(token_sets):
+            if emails[index]:
+                blocks[("email", emails[index])].append(index)
+            ranked = sorted(tokens, key=lambda token: (document_frequency[token], token))
+            for token in ranked[:self.prefix_length(len(tokens))]:
+                blocks[("token", token)].append(index)
+
+        neighbours: Dict[int, set] = defaultdict(set)
+        for members in blocks.values():
+            for position, first in enumerate(members[:-1]):
+                neighbours[first].update(members[position + 1:])
+
+        blocked_pairs = 0
+        candidates: Dict[int, List[int]] = {}
+        for first, later in neighbours.items():
+            blocked_pairs += len(later)
+            kept = [
+                second for second in sorted(later)
+                if self.upper_bound(
+                    len(token_sets[first]), len(token_sets[second]),
+                    bool(emails[first]) and emails[first] == emails[second]
+                ) >= self.threshold
+            ]
+            if kept:
+                candidates[first] = kept
+
+        stats = {
+            "blocks": len(blocks),
+            "blocked_pairs": blocked_pairs,
+            "candidate_pairs": sum(len(later) for later in candidates.values())
+        }
+        return candidates, stats
+
+
+class TicketClusters:
+    """Disjoint-set clustering of a ticket batch.
+
+    Pairs are merged with union(), so clusters are transitive: if A matches B
+    and B matches C, all three end up together. Once merging is done, ticket
+    to cluster and ticket to representative lookups are dictionary reads. The
+    representative of a cluster is its ticket with the latest modified_time
+    (the earliest in batch order on a tie).
+    """
+
+    def __init__(self, tickets: List[ZohoTicket]):
+        self.tickets = tickets
+        self._parent = list(range(len(tickets)))
+        self._size = [1] * len(tickets)
+        self._cluster_of: Optional[Dict[str, int]] = None
+        self._representative: Dict[int, int] = {}
+
+    def find(self, index: int) -> int:
+        """Root of the set containing index, compressing the path on the way"""
+        root = index
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[index] != root:
+            self._parent[index], index = root, self._parent[index]
+        return root
+
+    def union(self, index1: int, index2: int) -> bool:
+        """Merge the sets of two tickets; False if they were already together"""
+        root1, root2 = self.find(index1), self.find(index2)
+        if root1 == root2:
+            return False
+        if self._size[root1] < self._size[root2]:
+            root1, root2 = root2, root1
+        self._parent[root2] = root1
+        self._size[root1] += self._size[root2]
+        self._cluster_of = None
+        return True
+
+    def _index(self):
+        """Build the id-to-cluster and cluster-to-representative tables in one pass"""
+        if self._cluster_of is not None:
+            return
+        self._cluster_of = {}
+        self._representative = {}
+        for index, ticket in enumerate(self.tickets):
+            root = self.find(index)
+            self._cluster_of[ticket.id] = root
+            best = self._representative.get(root)
+            if best is None or ticket.modified_time > self.tickets[best].modified_time:
+                self._representative[root] = index
+
+    def cluster_of(self, ticket_id: str) -> int:
+        """Cluster id of a ticket"""
+        self._index()
+        return self._cluster_of[ticket_id]
+
+    def representative(self, ticket_id: str) -> ZohoTicket:
+        """Ticket kept for the cluster this ticket belongs to"""
+        self._index()
+        return self.tickets[self._representative[self._cluster_of[ticket_id]]]
+
+    def groups(self) -> List[List[ZohoTicket]]:
+        """Clusters with more than one ticket, each in batch order"""
+        self._index()
+        members: Dict[int, List[ZohoTicket]] = defaultdict(list)
+        for ticket in self.tickets:
+            members[self._cluster_of[ticket.id]].append(ticket)
+        return [group for group in members.values() if len(group) > 1]
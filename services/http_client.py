@@ -0,0 +1,88 @@
+import asyncio
+from typing import Dict, Optional
+import httpx
+from loguru import logger
+from config import settings
+
+# One pooled client per process, shared by the Zoho and ClickUp services
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Traffic through the shared client since the process started; callers diff two snapshots
+_stats = {"requests": 0, "bytes_sent": 0, "bytes_received": 0}
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+async def _count_request(request: httpx.Request):
+    _stats["requests"] += 1
+    _stats["bytes_sent"] += int(request.headers.get("content-length", 0))
+
+
+async def _count_response(response: httpx.Response):
+    # Every caller reads the whole body anyway, so reading it here costs nothing extra
+    await response.aread()
+    _stats["bytes_received"] += response.num_bytes_downloaded
+
+
+def http_stats() -> Dict[str, int]:
+    """Request count and bytes sent and received (as on the wire) by the shared client"""
+    return dict(_stats)
+
+
+def _build_client() -> httpx.AsyncClient:
+    """Create the pooled client from settings"""
+    http2 = settings.http2_enabled
+    if http2 and not _http2_available():
+        logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds
+        ),
+        timeout=httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds),
+        event_hooks={"request": [_count_request], "response": [_count_response]}
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Open the shared client (call once at startup)"""
+    client = get_http_client()
+    logger.info(f"HTTP client started (max {settings.http_max_connections} connections, "
+                f"{settings.http_max_keepalive_connections} kept alive)")
+    return client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared client, opening one if startup did not.
+
+    Pooled connections belong to the event loop that opened them, so a call
+    from a different loop (for example a second asyncio.run) gets a new client.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = _build_client()
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client and its pooled connections (call once at shutdown)"""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("HTTP client closed")
+    _client = None
+    _client_loop = None
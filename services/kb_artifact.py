@@ -0,0 +1,74 @@
+import json
+import mmap
+import os
+import pickle
+from datetime import datetime
+from typing import Dict, Optional
+
+from services.keyword_matcher import KeywordMatcher
+
+ARTIFACT_MAGIC = b"KBARTIFACT\n"
+ARTIFACT_FORMAT = 2
+
+class KnowledgeBaseArtifact:
+    """Precompiled knowledge base: rules and keyword automaton"""
+    
+    def __init__(self, header: Dict, rules: Dict[str, Dict], matcher: KeywordMatcher):
+        self.header = header
+        self.fingerprint = header["fingerprint"]
+        self.rules = rules
+        self.matcher = matcher
+
+def write_artifact(path: str, rules: Dict[str, Dict], fingerprint: str) -> Dict:
+    """Compile rules and write them to path, returning the artifact header"""
+    # Teams live in the rules and list routing stays in config, so neither is stored separately
+    matcher = KeywordMatcher(rules)
+    payload = pickle.dumps({
+        "rules": rules,
+        "matcher": matcher
+    }, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    header = {
+        "format": ARTIFACT_FORMAT,
+        "fingerprint": fingerprint,
+        "created_at": datetime.now().isoformat(),
+        "categories": len(rules),
+        "patterns": len(matcher.patterns),
+        "payload_bytes": len(payload)
+    }
+    
+    # Write to a temporary file first so readers never see a partial artifact
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(ARTIFACT_MAGIC)
+        file.write(json.dumps(header).encode("utf-8") + b"\n")
+        file.write(payload)
+    os.replace(temp_path, path)
+    
+    return header
+
+def read_artifact(path: str) -> Optional[KnowledgeBaseArtifact]:
+    """Memory-map and load an artifact, or return None if it is missing or unreadable"""
+    if not path or not os.path.exists(path):
+        return None
+    
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:len(ARTIFACT_MAGIC)] != ARTIFACT_MAGIC:
+                raise ValueError(f"{path} is not a knowledge base artifact")
+            
+            header_end = mapped.find(b"\n", len(ARTIFACT_MAGIC))
+            header = json.loads(mapped[len(ARTIFACT_MAGIC):header_end])
+            if header.get("format") != ARTIFACT_FORMAT:
+                raise ValueError(f"Unsupported artifact format {header.get('format')}")
+            
+            view = memoryview(mapped)[header_end + 1:]
+            try:
+                if len(view) != header["payload_bytes"]:
+                    raise ValueError(f"{path} is truncated")
+                # Artifacts are produced by our own build step, never taken from untrusted input
+                payload = pickle.loads(view)
+            finally:
+                view.release()
+    
+    return KnowledgeBaseArtifact(header, payload["rules"], payload["matcher"])
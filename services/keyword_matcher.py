@@ -0,0 +1,297 @@
+from collections import deque
+from typing import List, Dict, Tuple, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Vectorized batch scoring is optional
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+
+# Matcher installed once per worker process by init_worker
+_worker_matcher: Optional["KeywordMatcher"] = None
+
+
+def _is_word_char(char: str) -> bool:
+    """Match the regex definition of a \\w character"""
+    return char.isalnum() or char == "_"
+
+
+class _Automaton:
+    """Immutable Aho-Corasick automaton over a contiguous range of pattern ids"""
+
+    def __init__(self, patterns: List[str], first_id: int = 0):
+        self.first_id = first_id
+        self.size = len(patterns)
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Tuple[int, ...]] = [()]
+
+        for offset, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                state = next_state
+            self.output[state] = self.output[state] + (first_id + offset,)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def count(self, text: str, lengths: List[int], counts: Dict[int, int]):
+        """Add word-bounded, non-overlapping hits per pattern id to counts"""
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        text_length = len(text)
+        last_end: Dict[int, int] = {}
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for pattern_id in output[state]:
+                end = position + 1
+                start = end - lengths[pattern_id]
+                if start < last_end.get(pattern_id, 0):
+                    continue
+                if not _is_boundary(text, start, text_length):
+                    continue
+                if not _is_boundary(text, end, text_length):
+                    continue
+                counts[pattern_id] = counts.get(pattern_id, 0) + 1
+                last_end[pattern_id] = end
+
+
+def _is_boundary(text: str, position: int, text_length: int) -> bool:
+    """Check for a regex \\b between text[position - 1] and text[position]"""
+    before = position > 0 and _is_word_char(text[position - 1])
+    after = position < text_length and _is_word_char(text[position])
+    return before != after
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over every keyword of every category.
+
+    Scores are identical to running ``\\b<keyword>\\b`` with ``re.findall`` for
+    each keyword separately: a hit must sit on word boundaries at both ends and
+    repeated hits of the same keyword never overlap.
+
+    A matcher is never mutated once built. ``updated`` returns a new matcher
+    for a changed knowledge base that shares the compiled automata, so readers
+    holding the old one keep a consistent view.
+    """
+
+    # Rebuild from scratch once incremental updates leave this much extra work behind
+    COMPACT_MIN_PATTERNS = 256
+    COMPACT_FRACTION = 0.25
+
+    def __init__(self, category_rules: Dict[str, Dict]):
+        self.categories: List[str] = list(category_rules.keys())
+        self.patterns: List[str] = []
+        self.pattern_weights: List[List[Tuple[int, int]]] = []
+        self._pattern_ids: Dict[str, int] = {}
+
+        for category_index, category in enumerate(self.categories):
+            self._add_category(category_index, category_rules[category])
+
+        self._lengths = [len(pattern) for pattern in self.patterns]
+        self._automata = [_Automaton(self.patterns)]
+        self._weight_matrix = None
+
+    def _add_category(self, category_index: int, category_data: Dict) -> List[int]:
+        """Register a category's keywords, returning ids of patterns not seen before"""
+        new_pattern_ids = []
+        for rule in category_data.get("rules", []):
+            weight = rule["weight"]
+            for pattern in rule["patterns"]:
+                pattern = pattern.lower()
+                if not pattern:
+                    continue
+                pattern_id = self._pattern_ids.get(pattern)
+                if pattern_id is None:
+                    pattern_id = len(self.patterns)
+                    self._pattern_ids[pattern] = pattern_id
+                    self.patterns.append(pattern)
+                    self.pattern_weights.append([])
+                    new_pattern_ids.append(pattern_id)
+                # Duplicate keywords score once per occurrence, as before
+                self.pattern_weights[pattern_id].append((category_index, weight))
+        return new_pattern_ids
+
+    def updated(self, category_rules: Dict[str, Dict], changed_categories) -> "KeywordMatcher":
+        """New matcher for category_rules where only changed_categories differ from this one.
+
+        Unchanged categories keep their compiled keywords. Keywords that are
+        new to the matcher go into a small delta automaton next to the shared
+        base one; removed or reweighted keywords only change the weight table.
+        """
+        changed = set(changed_categories)
+        unknown = set(category_rules) - set(self.categories) - changed
+        if unknown:
+            raise ValueError(f"Categories missing from the change set: {sorted(unknown)}")
+
+        matcher = KeywordMatcher.__new__(KeywordMatcher)
+        matcher.categories = list(category_rules.keys())
+        new_index = {category: index for index, category in enumerate(matcher.categories)}
+
+        # Carry over weights of unchanged categories, remapped to the new category order
+        matcher.pattern_weights = []
+        for weights in self.pattern_weights:
+            matcher.pattern_weights.append([
+                (new_index[self.categories[category_index]], weight)
+                for category_index, weight in weights
+                if self.categories[category_index] not in changed and self.categories[category_index] in new_index
+            ])
+        matcher.patterns = list(self.patterns)
+        matcher._pattern_ids = dict(self._pattern_ids)
+
+        new_pattern_ids = []
+        for category in changed:
+            if category in category_rules:
+                new_pattern_ids.extend(matcher._add_category(new_index[category], category_rules[category]))
+
+        matcher._lengths = [len(pattern) for pattern in matcher.patterns]
+        matcher._weight_matrix = None
+        matcher._automata = list(self._automata)
+
+        if new_pattern_ids:
+            base = self._automata[0]
+            delta_patterns = matcher.patterns[base.size:]
+            matcher._automata = [base, _Automaton(delta_patterns, first_id=base.size)]
+
+        if matcher._needs_compaction():
+            return KeywordMatcher(category_rules)
+        return matcher
+
+    def _needs_compaction(self) -> bool:
+        """Whether the delta automaton or dead keywords have grown enough to rebuild"""
+        base_size = self._automata[0].size
+        limit = max(self.COMPACT_MIN_PATTERNS, int(base_size * self.COMPACT_FRACTION))
+        delta_size = len(self.patterns) - base_size
+        dead = sum(1 for weights in self.pattern_weights if not weights)
+        return delta_size > limit or dead > limit
+
+    def count_patterns(self, text: str) -> Dict[int, int]:
+        """Count word-bounded, non-overlapping hits per pattern id in one pass per automaton"""
+        text = text.lower()
+        counts: Dict[int, int] = {}
+        for automaton in self._automata:
+            automaton.count(text, self._lengths, counts)
+        return counts
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Weighted score for every category, in knowledge-base order"""
+        scores = [0] * len(self.categories)
+        for pattern_id, count in self.count_patterns(text).items():
+            for category_index, weight in self.pattern_weights[pattern_id]:
+                scores[category_index] += count * weight
+        return dict(zip(self.categories, scores))
+
+    @property
+    def weight_matrix(self):
+        """Keyword-by-category weight matrix used for vectorized scoring"""
+        if self._weight_matrix is None:
+            matrix = np.zeros((len(self.patterns), len(self.categories)), dtype=np.int64)
+            for pattern_id, weights in enumerate(self.pattern_weights):
+                for category_index, weight in weights:
+                    matrix[pattern_id, category_index] += weight
+            self._weight_matrix = matrix
+        return self._weight_matrix
+
+    def score_matrix(self, texts: List[str]):
+        """Ticket-by-category score matrix for a whole batch of texts"""
+        if np is None:
+            raise RuntimeError("NumPy is required for vectorized scoring")
+
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[int] = []
+        for row, text in enumerate(texts):
+            for pattern_id, count in self.count_patterns(text).items():
+                rows.append(row)
+                columns.append(pattern_id)
+                values.append(count)
+
+        shape = (len(texts), len(self.patterns))
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        values = np.asarray(values, dtype=np.int64)
+
+        if sparse is not None:
+            counts = sparse.csr_matrix((values, (rows, columns)), shape=shape)
+            return np.asarray(counts @ self.weight_matrix)
+
+        # Without SciPy, accumulate the sparse product straight from COO triples
+        scores = np.zeros((len(texts), len(self.categories)), dtype=np.int64)
+        np.add.at(scores, rows, values[:, None] * self.weight_matrix[columns])
+        return scores
+
+    def best_matches(self, texts: List[str]) -> List[Tuple[int, int, int, int]]:
+        """Top category index and score, then runner-up index and score, per text.
+
+        An index is -1 when there are not enough categories.
+        """
+        if not self.categories:
+            return [(-1, 0, -1, 0)] * len(texts)
+
+        if np is not None:
+            scores = self.score_matrix(texts)
+            best_index = scores.argmax(axis=1)
+            best_score = scores[np.arange(len(texts)), best_index]
+            runner_up_index, runner_up = runner_up_matches(scores, best_index)
+            return list(zip(best_index.tolist(), best_score.tolist(), runner_up_index.tolist(), runner_up.tolist()))
+
+        matches = []
+        for text in texts:
+            scores = list(self.score(text).values())
+            best_index = max(range(len(scores)), key=scores.__getitem__)
+            others = [index for index in range(len(scores)) if index != best_index]
+            runner_up_index = max(others, key=scores.__getitem__, default=-1)
+            runner_up = scores[runner_up_index] if runner_up_index >= 0 else 0
+            matches.append((best_index, scores[best_index], runner_up_index, runner_up))
+        return matches
+
+
+def runner_up_matches(scores, best_index):
+    """Index and score of the second-best category in each row of a score matrix.
+
+    The index is -1 (score 0) when there are fewer than two categories.
+    """
+    rows = np.arange(scores.shape[0])
+    if scores.shape[1] < 2:
+        return np.full(scores.shape[0], -1), np.zeros(scores.shape[0], dtype=scores.dtype)
+    masked = scores.astype(float)
+    masked[rows, best_index] = -np.inf
+    runner_up_index = masked.argmax(axis=1)
+    return runner_up_index, scores[rows, runner_up_index]
+
+
+def init_worker(matcher: KeywordMatcher):
+    """Process pool initializer: keep the compiled matcher for the worker's lifetime"""
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def score_chunk(texts: List[str]) -> List[Tuple[int, int, int, int]]:
+    """Score a chunk of texts with the matcher installed by init_worker"""
+    return _worker_matcher.best_matches(texts)
@@ -1,15 +1,214 @@
 import json
-from typing import List, Dict, Optional
+import hashlib
+import threading
+import time
+from typing import List, Dict, Optional, Iterable, Set, Tuple, FrozenSet
 from sqlalchemy.orm import Session
 from loguru import logger
 
-from models import KnowledgeBase
+from models import KnowledgeBase, KnowledgeBaseVersion
 from database import get_db
+from config import settings
+from services.kb_artifact import read_artifact
+
+class KnowledgeBaseSnapshot:
+    """Read-only view of the active knowledge base at a given version"""
+    
+    def __init__(self, version: int, rules: Dict[str, Dict], matcher=None):
+        self.version = version
+        self.rules = rules
+        self.teams = {category: data["team"] for category, data in rules.items()}
+        # Content fingerprint, stable across processes and restarts
+        self.fingerprint = self.compute_fingerprint(rules)
+        # Precompiled KeywordMatcher when the snapshot came from a build artifact
+        self.matcher = matcher
+    
+    @staticmethod
+    def compute_fingerprint(rules: Dict[str, Dict]) -> str:
+        """Content hash of a rule set"""
+        return hashlib.sha1(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()[:16]
 
 class KnowledgeBaseService:
-    def __init__(self):
+    # Shared by every instance so a write through one service is seen by all
+    _version = 0
+    _snapshot: Optional[KnowledgeBaseSnapshot] = None
+    _snapshot_lock = threading.Lock()
+    # (version, categories changed by it or None for a full reload), newest last
+    _change_log: List[Tuple[int, Optional[FrozenSet[str]]]] = []
+    _change_log_size = 100
+    # kb_version row already covered by the change log (None until read); other processes bump it too
+    _db_version: Optional[int] = None
+    _last_version_poll: Optional[float] = None
+    # None, or "pending" / "checking" / "checked" while a loaded artifact awaits its database check
+    _artifact_state: Optional[str] = None
+    _artifact_fingerprint: Optional[str] = None
+    
+    def __init__(self, artifact_path: Optional[str] = None):
+        artifact_path = settings.kb_artifact_path if artifact_path is None else artifact_path
+        if artifact_path and self.load_artifact(artifact_path):
+            # Seeding and the version check run lazily, off the cold-start path
+            return
         self.ensure_default_knowledge_base()
     
+    @classmethod
+    def load_artifact(cls, path: str) -> bool:
+        """Install the rule snapshot from a precompiled artifact without touching the database"""
+        if cls._snapshot is not None:
+            return True
+        
+        try:
+            artifact = read_artifact(path)
+        except Exception as e:
+            logger.warning(f"Ignoring knowledge base artifact {path}: {str(e)}")
+            return False
+        
+        if artifact is None:
+            return False
+        
+        with cls._snapshot_lock:
+            if cls._snapshot is None:
+                cls._snapshot = KnowledgeBaseSnapshot(cls._version, artifact.rules, artifact.matcher)
+                cls._artifact_fingerprint = artifact.fingerprint
+                cls._artifact_state = "pending"
+                logger.info(f"Loaded knowledge base artifact {path} ({artifact.header['categories']} categories, "
+                            f"fingerprint {artifact.fingerprint})")
+        return True
+    
+    def verify_artifact(self):
+        """Compare the loaded artifact with the database and drop it if it is stale"""
+        try:
+            self.ensure_default_knowledge_base()
+            # Read the version first so a write made during the check is still picked up by the next poll
+            db_version = self._read_database_version()
+            rules = self._build_categorization_rules(self.get_all_knowledge_base())
+            fingerprint = KnowledgeBaseSnapshot.compute_fingerprint(rules)
+            
+            if fingerprint != KnowledgeBaseService._artifact_fingerprint:
+                logger.warning(f"Knowledge base artifact is stale ({KnowledgeBaseService._artifact_fingerprint} != "
+                               f"{fingerprint}), reloading rules from the database")
+                self.invalidate_snapshot(db_version=db_version)
+            else:
+                logger.info("Knowledge base artifact matches the database")
+                with KnowledgeBaseService._snapshot_lock:
+                    KnowledgeBaseService._db_version = db_version
+            KnowledgeBaseService._last_version_poll = time.monotonic()
+        except Exception as e:
+            logger.error(f"Error verifying knowledge base artifact: {str(e)}")
+        finally:
+            KnowledgeBaseService._artifact_state = "checked"
+    
+    def _schedule_artifact_check(self):
+        """Start the artifact check in the background the first time the snapshot is used"""
+        with KnowledgeBaseService._snapshot_lock:
+            if KnowledgeBaseService._artifact_state != "pending":
+                return
+            KnowledgeBaseService._artifact_state = "checking"
+        
+        threading.Thread(target=self.verify_artifact, name="kb-artifact-check", daemon=True).start()
+    
+    @classmethod
+    def invalidate_snapshot(cls, changed_categories: Optional[Iterable[str]] = None,
+                            db_version: Optional[int] = None):
+        """Mark the in-memory rule snapshot as stale after a knowledge base write"""
+        with cls._snapshot_lock:
+            cls._version += 1
+            changed = frozenset(changed_categories) if changed_categories is not None else None
+            if db_version is not None:
+                # A gap means another process wrote in between, and what it changed is unknown
+                if cls._db_version is None or db_version != cls._db_version + 1:
+                    changed = None
+                cls._db_version = max(db_version, cls._db_version or 0)
+            cls._change_log = cls._change_log[-(cls._change_log_size - 1):] + [(cls._version, changed)]
+    
+    @classmethod
+    def get_changes_since(cls, version: Optional[int]) -> Optional[Set[str]]:
+        """Categories changed after a snapshot version, or None if a full reload is needed"""
+        with cls._snapshot_lock:
+            if version is None:
+                return None
+            if version == cls._version:
+                return set()
+            
+            newer = [changed for logged_version, changed in cls._change_log if logged_version > version]
+            # The log was truncated past this version, so the change set is unknown
+            if len(newer) != cls._version - version:
+                return None
+            
+            changed_categories = set()
+            for changed in newer:
+                if changed is None:
+                    return None
+                changed_categories.update(changed)
+            return changed_categories
+    
+    def get_snapshot(self) -> KnowledgeBaseSnapshot:
+        """Get the current rule snapshot, rebuilding it only if the knowledge base changed"""
+        if KnowledgeBaseService._artifact_state == "pending":
+            self._schedule_artifact_check()
+        self._poll_database_version()
+        
+        snapshot = KnowledgeBaseService._snapshot
+        if snapshot is not None and snapshot.version == KnowledgeBaseService._version:
+            return snapshot
+        
+        with KnowledgeBaseService._snapshot_lock:
+            snapshot = KnowledgeBaseService._snapshot
+            version = KnowledgeBaseService._version
+            if snapshot is None or snapshot.version != version:
+                kb_entries = self.get_all_knowledge_base()
+                snapshot = KnowledgeBaseSnapshot(version, self._build_categorization_rules(kb_entries))
+                
+                # An empty read is most likely a failed query, so retry it next time
+                if kb_entries:
+                    KnowledgeBaseService._snapshot = snapshot
+                    logger.info(f"Built knowledge base snapshot v{version} with {len(snapshot.rules)} categories")
+            return snapshot
+    
+    def _poll_database_version(self):
+        """Invalidate the snapshot when another process wrote to the knowledge base.
+        
+        Checks the kb_version row at most every kb_version_poll_seconds; a
+        write through this process invalidates the snapshot straight away.
+        """
+        if KnowledgeBaseService._artifact_state in ("pending", "checking"):
+            return  # The artifact check reads the version itself
+        
+        now = time.monotonic()
+        last_poll = KnowledgeBaseService._last_version_poll
+        if last_poll is not None and now - last_poll < settings.kb_version_poll_seconds:
+            return
+        KnowledgeBaseService._last_version_poll = now
+        
+        db_version = self._read_database_version()
+        if db_version is not None and db_version != KnowledgeBaseService._db_version:
+            if KnowledgeBaseService._db_version is not None:
+                logger.info(f"Knowledge base changed by another process (version {KnowledgeBaseService._db_version} -> "
+                            f"{db_version}), reloading rules")
+            self.invalidate_snapshot(db_version=db_version)
+    
+    def _read_database_version(self) -> Optional[int]:
+        """Current kb_version, 0 before the first write, or None if it could not be read"""
+        db = next(get_db())
+        try:
+            version = db.query(KnowledgeBaseVersion.version).filter(KnowledgeBaseVersion.id == 1).scalar()
+            return version or 0
+        except Exception as e:
+            logger.error(f"Error reading knowledge base version: {str(e)}")
+            return None
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _bump_database_version(db: Session) -> int:
+        """Increment kb_version as part of the caller's transaction and return the new version"""
+        updated = db.query(KnowledgeBaseVersion).filter(KnowledgeBaseVersion.id == 1).update(
+            {KnowledgeBaseVersion.version: KnowledgeBaseVersion.version + 1}, synchronize_session=False
+        )
+        if not updated:
+            db.add(KnowledgeBaseVersion(id=1, version=1))
+            db.flush()
+        return db.query(KnowledgeBaseVersion.version).filter(KnowledgeBaseVersion.id == 1).scalar()
+    
     def ensure_default_knowledge_base(self):
         """Ensure default knowledge base exists in database"""
         db = next(get_db())
@@ -156,7 +355,9 @@ class KnowledgeBaseService:
             )
             db.add(kb_record)
         
+        db_version = self._bump_database_version(db)
         db.commit()
+        self.invalidate_snapshot(db_version=db_version)
         logger.info(f"Loaded {len(default_kb)} default knowledge base entries")
     
     def add_knowledge_base_entries(self, entries: List[Dict]) -> bool:
@@ -188,7 +389,9 @@ class KnowledgeBaseService:
                     )
                     db.add(kb_record)
             
+            db_version = self._bump_database_version(db)
             db.commit()
+            self.invalidate_snapshot((entry["category"] for entry in entries), db_version=db_version)
             logger.info(f"Added/updated {len(entries)} knowledge base entries")
             return True
             
@@ -229,7 +432,10 @@ class KnowledgeBaseService:
     
     def get_categorization_rules(self) -> Dict[str, Dict]:
         """Get categorization rules for the categorization service"""
-        kb_entries = self.get_all_knowledge_base()
+        return self.get_snapshot().rules
+    
+    def _build_categorization_rules(self, kb_entries: List[Dict]) -> Dict[str, Dict]:
+        """Build categorization rules from knowledge base entries"""
         rules = {}
         
         for entry in kb_entries:
@@ -282,7 +488,9 @@ class KnowledgeBaseService:
                 )
                 db.add(kb_record)
             
+            db_version = self._bump_database_version(db)
             db.commit()
+            self.invalidate_snapshot(db_version=db_version)
             logger.info(f"Updated knowledge base with {len(kb_data)} entries")
             return True
             
@@ -295,23 +503,7 @@ class KnowledgeBaseService:
     
     def get_team_for_category(self, category: str) -> str:
         """Get team assignment for a category"""
-        db = next(get_db())
-        try:
-            entry = db.query(KnowledgeBase).filter(
-                KnowledgeBase.category == category,
-                KnowledgeBase.is_active == True
-            ).first()
-            
-            if entry:
-                return entry.team
-            else:
-                return "Product/Tech"  # Default team
-                
-        except Exception as e:
-            logger.error(f"Error getting team for category {category}: {str(e)}")
-            return "Product/Tech"
-        finally:
-            db.close()
+        return self.get_snapshot().teams.get(category, "Product/Tech")  # Default team
     
     def get_knowledge_base_summary(self) -> List[Dict]:
         """Get summary of current knowledge base"""
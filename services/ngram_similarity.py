@@ -0,0 +1,121 @@
+import zlib
+from collections import Counter
+from typing import List, Tuple, Iterator
+from loguru import logger
+
+try:
+    import numpy as np
+except ImportError:  # The n-gram engine needs NumPy; callers fall back to word overlap
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+# Without SciPy vectors are stored dense, so fold them down to a width that fits in memory
+DENSE_DIMENSIONS = 4096
+
+
+class NgramSimilarityEngine:
+    """Cosine similarity of hashed character n-gram vectors.
+
+    Character n-grams survive the typos word overlap trips on ("battries" and
+    "batteries" still share most trigrams). Each text becomes a fixed-width,
+    L2-normalized vector of hashed n-gram counts, and neighbours for a whole
+    batch come from matrix products taken a block of rows at a time, so the
+    dense similarity block in memory never exceeds the configured budget.
+    """
+
+    def __init__(self, n: int = 3, dimensions: int = 1 << 18, block_memory_mb: int = 256):
+        if np is None:
+            raise RuntimeError("NumPy is required for n-gram similarity")
+        self.n = n
+        self.dimensions = dimensions if sparse is not None else min(dimensions, DENSE_DIMENSIONS)
+        self.block_memory_mb = block_memory_mb
+
+    def ngram_counts(self, text: str) -> Counter:
+        """Hashed n-gram counts of a text, padded so word starts and ends form their own n-grams"""
+        padded = f" {' '.join(text.lower().split())} "
+        if len(padded.strip()) == 0:
+            return Counter()
+        if len(padded) < self.n:
+            return Counter([zlib.crc32(padded.encode("utf-8")) % self.dimensions])
+        return Counter(
+            zlib.crc32(padded[start:start + self.n].encode("utf-8")) % self.dimensions
+            for start in range(len(padded) - self.n + 1)
+        )
+
+    def vectorize(self, texts: List[str]):
+        """Row-normalized text-by-dimension matrix (SciPy CSR, or dense without SciPy)"""
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[float] = []
+        for row, text in enumerate(texts):
+            for column, count in self.ngram_counts(text).items():
+                rows.append(row)
+                columns.append(column)
+                values.append(count)
+
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float32)
+
+        norms = np.zeros(len(texts), dtype=np.float32)
+        np.add.at(norms, rows, values * values)
+        norms = np.sqrt(norms)
+        if len(values):
+            values = values / norms[rows]
+
+        shape = (len(texts), self.dimensions)
+        if sparse is not None:
+            return sparse.csr_matrix((values, (rows, columns)), shape=shape)
+
+        matrix = np.zeros(shape, dtype=np.float32)
+        np.add.at(matrix, (rows, columns), values)
+        return matrix
+
+    def _block_rows(self, total: int) -> int:
+        """Rows per block so one float32 block of similarities stays within the memory budget"""
+        return max(1, (self.block_memory_mb * 1024 * 1024) // (max(total, 1) * 4))
+
+    def _similarity_blocks(self, matrix) -> Iterator[Tuple[int, "np.ndarray"]]:
+        """Yield (first row, dense block of similarities against every row)"""
+        total = matrix.shape[0]
+        transposed = matrix.T.tocsc() if sparse is not None else matrix.T
+        step = self._block_rows(total)
+        for start in range(0, total, step):
+            block = matrix[start:start + step] @ transposed
+            if sparse is not None:
+                block = block.toarray()
+            yield start, np.asarray(block, dtype=np.float32)
+
+    def top_k(self, texts: List[str], k: int = 5, min_similarity: float = 0.0) -> List[List[Tuple[int, float]]]:
+        """For every text, up to k other texts with the highest cosine similarity, best first"""
+        total = len(texts)
+        neighbours: List[List[Tuple[int, float]]] = [[] for _ in range(total)]
+        if total < 2 or k <= 0:
+            return neighbours
+
+        k = min(k, total - 1)
+        matrix = self.vectorize(texts)
+        for start, block in self._similarity_blocks(matrix):
+            block_rows = np.arange(block.shape[0])
+            block[block_rows, start + block_rows] = -1.0  # never your own neighbour
+
+            candidates = np.argpartition(block, -k, axis=1)[:, -k:]
+            scores = np.take_along_axis(block, candidates, axis=1)
+            order = np.argsort(-scores, axis=1, kind="stable")
+            candidates = np.take_along_axis(candidates, order, axis=1)
+            scores = np.take_along_axis(scores, order, axis=1)
+
+            for offset in range(block.shape[0]):
+                neighbours[start + offset] = [
+                    (int(column), float(score))
+                    for column, score in zip(candidates[offset], scores[offset])
+                    if score > 0 and score >= min_similarity
+                ]
+
+        logger.debug(f"Computed top-{k} n-gram neighbours for {total} texts "
+                     f"in blocks of {self._block_rows(total)} rows")
+        return neighbours
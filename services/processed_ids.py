@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Set
+
+from models import SyncLog, ProcessingStatus
+from database import get_db, chunked
+
+# Statuses that mean a sync must not send the ticket to ClickUp (retrying tickets belong to the retry queue)
+_DONE_STATUSES = [ProcessingStatus.SUCCESS.value, ProcessingStatus.DUPLICATE.value, ProcessingStatus.RETRYING.value]
+# Only these are final; a retrying ticket can still end up failed and must then be picked up again
+_CACHED_STATUSES = {ProcessingStatus.SUCCESS.value, ProcessingStatus.DUPLICATE.value}
+
+
+class ProcessedIdLookup:
+    """Answers "which of these Zoho tickets were already handled" for one batch at a time.
+
+    Only the ids of the batch are looked up, through the unique index on
+    SyncLog.zoho_ticket_id, so the cost follows the batch size rather than the
+    size of the sync history. Ids of successful and duplicate tickets are kept
+    in a bounded LRU so tickets that show up again in overlapping sync windows
+    skip the query.
+    """
+
+    def __init__(self, cache_size: int = 50000):
+        self.cache_size = cache_size
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def processed_ids(self, ticket_ids: Iterable[str]) -> Set[str]:
+        """Subset of ticket_ids already logged as success, duplicate or retrying"""
+        ticket_ids = list(dict.fromkeys(ticket_ids))
+        with self._lock:
+            done = {ticket_id for ticket_id in ticket_ids if ticket_id in self._recent}
+            for ticket_id in done:
+                self._recent.move_to_end(ticket_id)
+
+        unknown = [ticket_id for ticket_id in ticket_ids if ticket_id not in done]
+        if unknown:
+            found = self._query(unknown)
+            self.remember(ticket_id for ticket_id, status in found.items() if status in _CACHED_STATUSES)
+            done |= found.keys()
+
+        return done
+
+    def _query(self, ticket_ids: List[str]) -> Dict[str, str]:
+        """Look the ids up in SyncLog, returning the status of each one that is done"""
+        db = next(get_db())
+        try:
+            found = {}
+            for chunk in chunked(ticket_ids):
+                found.update(
+                    db.query(SyncLog.zoho_ticket_id, SyncLog.status).filter(
+                        SyncLog.zoho_ticket_id.in_(chunk),
+                        SyncLog.status.in_(_DONE_STATUSES)
+                    ).all()
+                )
+            return found
+        finally:
+            db.close()
+
+    def remember(self, ticket_ids: Iterable[str]):
+        """Record ids that have just been handled"""
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            for ticket_id in ticket_ids:
+                self._recent[ticket_id] = None
+                self._recent.move_to_end(ticket_id)
+            while len(self._recent) > self.cache_size:
+                self._recent.popitem(last=False)
+
+    def clear(self):
+        """Forget every cached id"""
+        with self._lock:
+            self._recent.clear()
@@ -0,0 +1,87 @@
+import random
+from datetime import datetime, timedelta
+from typing import List, Optional
+from loguru import logger
+
+from models import RetryQueueItem, ProcessedTicket
+from database import get_db
+
+
+class RetryQueue:
+    """Durable queue of tickets whose ClickUp task creation failed.
+
+    Items live in the retry_queue table with their next attempt time, so
+    pending retries survive restarts. Delays grow exponentially with the
+    number of failed attempts and are jittered so a burst of failures does
+    not come back as a burst of retries.
+    """
+
+    def __init__(self, base_delay_seconds: float = 30, max_delay_seconds: float = 3600):
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+
+    def backoff_delay(self, attempts: int) -> float:
+        """Seconds to wait after the given number of failed attempts (equal jitter)"""
+        delay = min(self.max_delay_seconds, self.base_delay_seconds * 2 ** max(attempts - 1, 0))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def enqueue(self, processed_ticket: ProcessedTicket, error: Optional[str], attempts: int = 1) -> bool:
+        """Add or reschedule a ticket after a failed attempt"""
+        db = next(get_db())
+        try:
+            ticket_id = processed_ticket.zoho_ticket.id
+            next_attempt_at = datetime.now() + timedelta(seconds=self.backoff_delay(attempts))
+
+            item = db.query(RetryQueueItem).filter(RetryQueueItem.zoho_ticket_id == ticket_id).first()
+            if item is None:
+                item = RetryQueueItem(zoho_ticket_id=ticket_id)
+                db.add(item)
+            item.payload = processed_ticket.model_dump_json()
+            item.attempts = attempts
+            item.next_attempt_at = next_attempt_at
+            item.last_error = error
+
+            db.commit()
+            logger.info(f"Queued ticket {ticket_id} for retry {attempts} at {next_attempt_at:%H:%M:%S}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to queue ticket for retry: {str(e)}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+    def due_items(self, limit: int = 100) -> List[RetryQueueItem]:
+        """Items whose next attempt time has passed, oldest first"""
+        db = next(get_db())
+        try:
+            items = db.query(RetryQueueItem).filter(
+                RetryQueueItem.next_attempt_at <= datetime.now()
+            ).order_by(RetryQueueItem.next_attempt_at).limit(limit).all()
+            db.expunge_all()
+            return items
+        finally:
+            db.close()
+
+    def remove(self, zoho_ticket_id: str):
+        """Drop a ticket from the queue once it succeeded or ran out of attempts"""
+        db = next(get_db())
+        try:
+            db.query(RetryQueueItem).filter(
+                RetryQueueItem.zoho_ticket_id == zoho_ticket_id
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to remove ticket {zoho_ticket_id} from retry queue: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def size(self) -> int:
+        """Number of queued tickets"""
+        db = next(get_db())
+        try:
+            return db.query(RetryQueueItem).count()
+        finally:
+            db.close()
@@ -0,0 +1,149 @@
+import hashlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Iterable, Optional
+from loguru import logger
+
+from models import ZohoTicket, SyncLog, ProcessingStatus
+from services.ticket_normalizer import normalize_ticket
+from database import get_db, chunked
+
+SIMHASH_BITS = 64
+# The fingerprint is split into this many 16-bit blocks, each stored in its own indexed column
+SIMHASH_BLOCKS = 4
+_BLOCK_BITS = SIMHASH_BITS // SIMHASH_BLOCKS
+_BLOCK_MASK = (1 << _BLOCK_BITS) - 1
+
+
+def _feature_hash(token: str) -> int:
+    """Stable 64-bit hash of a token"""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(tokens: Iterable[str]) -> int:
+    """64-bit SimHash of a token stream, weighting each token by its frequency"""
+    totals = [0] * SIMHASH_BITS
+    for token, count in Counter(tokens).items():
+        value = _feature_hash(token)
+        for bit in range(SIMHASH_BITS):
+            totals[bit] += count if value >> bit & 1 else -count
+
+    fingerprint = 0
+    for bit, total in enumerate(totals):
+        if total > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def simhash_blocks(fingerprint: int) -> List[int]:
+    """The 16-bit blocks of a fingerprint, lowest block first"""
+    return [(fingerprint >> (block * _BLOCK_BITS)) & _BLOCK_MASK for block in range(SIMHASH_BLOCKS)]
+
+
+def hamming_distance(fingerprint1: int, fingerprint2: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return bin(fingerprint1 ^ fingerprint2).count("1")
+
+
+def to_signed(fingerprint: int) -> int:
+    """Store an unsigned 64-bit fingerprint in a signed BIGINT column"""
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    """Inverse of to_signed"""
+    return value + (1 << SIMHASH_BITS) if value < 0 else value
+
+
+def ticket_simhash(ticket: ZohoTicket) -> Optional[int]:
+    """SimHash of a ticket's normalized subject and description, or None when it has no tokens"""
+    normalized = normalize_ticket(ticket)
+    # Every token-less text would hash to 0 and match every other one
+    if normalized.simhash is None and normalized.tokens:
+        normalized.simhash = simhash(normalized.tokens)
+    return normalized.simhash
+
+
+def sync_log_simhash_columns(ticket: ZohoTicket) -> Dict[str, Optional[int]]:
+    """SyncLog column values carrying a ticket's fingerprint (NULL when it has none)"""
+    fingerprint = ticket_simhash(ticket)
+    if fingerprint is None:
+        return {"simhash": None, **{f"simhash_block_{block}": None for block in range(SIMHASH_BLOCKS)}}
+    columns = {"simhash": to_signed(fingerprint)}
+    for block, value in enumerate(simhash_blocks(fingerprint)):
+        columns[f"simhash_block_{block}"] = value
+    return columns
+
+
+class SimHashLookup:
+    """Near-duplicate search over the SimHash fingerprints stored on SyncLog.
+
+    Two fingerprints within Hamming distance k < SIMHASH_BLOCKS differ in at
+    most k of the four 16-bit blocks, so at least one block is identical
+    (pigeonhole). Candidates are therefore found with indexed equality
+    lookups on the block columns and confirmed with the exact distance.
+    Only tickets created within the retention window, with their SyncLog
+    row still there, are matched; in server mode the nightly cleanup keeps
+    the latest 1000 rows.
+    """
+
+    def __init__(self, max_distance: int = 3, retention_days: int = 14):
+        if not 0 <= max_distance < SIMHASH_BLOCKS:
+            raise ValueError(f"SimHash lookup supports distances 0-{SIMHASH_BLOCKS - 1}, got {max_distance}")
+        self.max_distance = max_distance
+        self.retention_days = retention_days
+
+    def find_near_duplicates(self, tickets: List[ZohoTicket]) -> Dict[str, str]:
+        """Map each ticket close to an already created one to that ticket's id"""
+        fingerprints = {ticket.id: ticket_simhash(ticket) for ticket in tickets}
+        fingerprints = {ticket_id: fingerprint for ticket_id, fingerprint in fingerprints.items() if fingerprint is not None}
+        if not fingerprints:
+            return {}
+
+        db = next(get_db())
+        try:
+            # SyncLog.created_at is stamped by the database in UTC
+            cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+
+            # Each block column is queried separately so every lookup can use its own index
+            candidates: Dict[str, int] = {}
+            for block in range(SIMHASH_BLOCKS):
+                column = getattr(SyncLog, f"simhash_block_{block}")
+                values = sorted({simhash_blocks(fingerprint)[block] for fingerprint in fingerprints.values()})
+                for chunk in chunked(values):
+                    for zoho_ticket_id, value in db.query(SyncLog.zoho_ticket_id, SyncLog.simhash).filter(
+                        column.in_(chunk),
+                        SyncLog.status == ProcessingStatus.SUCCESS.value,
+                        SyncLog.created_at >= cutoff
+                    ):
+                        candidates[zoho_ticket_id] = to_unsigned(value)
+
+            candidates_by_block: Dict[tuple, List[str]] = {}
+            for zoho_ticket_id, fingerprint in candidates.items():
+                for block, value in enumerate(simhash_blocks(fingerprint)):
+                    candidates_by_block.setdefault((block, value), []).append(zoho_ticket_id)
+
+            duplicates = {}
+            for ticket_id, fingerprint in fingerprints.items():
+                # Closest match wins, ties broken by id so the result does not depend on query order
+                best = None
+                for block, value in enumerate(simhash_blocks(fingerprint)):
+                    for candidate_id in candidates_by_block.get((block, value), []):
+                        if candidate_id == ticket_id:
+                            continue
+                        distance = hamming_distance(fingerprint, candidates[candidate_id])
+                        if distance <= self.max_distance and (best is None or (distance, candidate_id) < best):
+                            best = (distance, candidate_id)
+                if best is not None:
+                    duplicates[ticket_id] = best[1]
+
+            logger.info(f"SimHash lookup: {len(duplicates)} of {len(tickets)} tickets within "
+                        f"{self.max_distance} bits of a ticket created in the last {self.retention_days} days "
+                        f"({len(candidates)} candidates)")
+            return duplicates
+
+        except Exception as e:
+            logger.error(f"Error querying SimHash fingerprints: {str(e)}")
+            return {}
+        finally:
+            db.close()
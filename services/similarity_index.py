@@ -0,0 +1,209 @@
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import List, Dict, Set
+from loguru import logger
+
+from models import ZohoTicket, TicketSignature, TicketSignatureBand, SyncLog, ProcessingStatus
+from services.duplicate_detection import MinHashLSH
+from services.sync_watermark import watermark_key
+from services.ticket_normalizer import normalize_ticket
+from database import get_db, chunked
+
+
+class SimilarityIndex:
+    """Persistent MinHash/LSH index of recently processed tickets.
+
+    Each processed ticket leaves its content fingerprint, subject words and
+    LSH band keys in the database. A new ticket is looked up by its own band
+    keys and fingerprint, both indexed columns, so the cost of a check
+    depends on the handful of candidates found rather than on how many
+    tickets the index holds. Only candidates whose ClickUp task was created
+    count, and they must match on text alone: across runs, the same reporter
+    writing again is not evidence of a repeat. When several match, the one
+    modified last is kept, as within a batch.
+    """
+
+    def __init__(self, lsh: MinHashLSH, retention_days: int = 14):
+        self.lsh = lsh
+        self.retention_days = retention_days
+
+    def _cutoff(self) -> datetime:
+        return datetime.now() - timedelta(days=self.retention_days)
+
+    def find_duplicates(self, tickets: List[ZohoTicket], similarity_threshold: float = 0.8) -> Dict[str, str]:
+        """Map each ticket that repeats an indexed one to the id of the latest such ticket"""
+        if not tickets:
+            return {}
+
+        band_keys: Dict[str, List[int]] = {}
+        for ticket in tickets:
+            signature = self.lsh.hasher.signature(normalize_ticket(ticket).subject_token_set)
+            band_keys[ticket.id] = self.lsh.band_keys(signature)
+
+        db = next(get_db())
+        try:
+            cutoff = self._cutoff()
+
+            # Gather candidates from shared LSH buckets and identical content
+            tickets_by_key: Dict[int, List[str]] = defaultdict(list)
+            for ticket_id, keys in band_keys.items():
+                for key in keys:
+                    tickets_by_key[key].append(ticket_id)
+
+            candidate_ids: Dict[str, Set[str]] = defaultdict(set)
+            for keys in chunked(list(tickets_by_key)):
+                for band_key, indexed_id in db.query(
+                    TicketSignatureBand.band_key, TicketSignatureBand.zoho_ticket_id
+                ).filter(TicketSignatureBand.band_key.in_(keys)):
+                    for ticket_id in tickets_by_key[band_key]:
+                        candidate_ids[ticket_id].add(indexed_id)
+
+            tickets_by_hash: Dict[str, List[str]] = defaultdict(list)
+            for ticket in tickets:
+                tickets_by_hash[normalize_ticket(ticket).content_hash].append(ticket.id)
+            for hashes in chunked(list(tickets_by_hash)):
+                for content_hash, indexed_id in db.query(
+                    TicketSignature.content_hash, TicketSignature.zoho_ticket_id
+                ).filter(TicketSignature.content_hash.in_(hashes), TicketSignature.created_at >= cutoff):
+                    for ticket_id in tickets_by_hash[content_hash]:
+                        candidate_ids[ticket_id].add(indexed_id)
+
+            # A ticket is never a duplicate of its own earlier processing
+            for ticket_id, ids in candidate_ids.items():
+                ids.discard(ticket_id)
+
+            # Tickets still pending or retrying may fail yet, so only created tasks are matched
+            wanted = sorted(set().union(*candidate_ids.values())) if candidate_ids else []
+            indexed: Dict[str, TicketSignature] = {}
+            for ids in chunked(wanted):
+                for entry in db.query(TicketSignature).join(
+                    SyncLog, SyncLog.zoho_ticket_id == TicketSignature.zoho_ticket_id
+                ).filter(
+                    TicketSignature.zoho_ticket_id.in_(ids),
+                    TicketSignature.created_at >= cutoff,
+                    SyncLog.status == ProcessingStatus.SUCCESS.value
+                ):
+                    indexed[entry.zoho_ticket_id] = entry
+
+            duplicates = {}
+            for ticket in tickets:
+                normalized = normalize_ticket(ticket)
+                best = None
+                for indexed_id in candidate_ids.get(ticket.id, ()):
+                    entry = indexed.get(indexed_id)
+                    if entry is None or self._similarity(normalized, entry) < similarity_threshold:
+                        continue
+                    # Rows indexed before modified_time was stored fall back to when they were indexed
+                    order = (entry.modified_time or entry.created_at, entry.zoho_ticket_id)
+                    if best is None or order > best:
+                        best = order
+                if best is not None:
+                    duplicates[ticket.id] = best[1]
+
+            logger.info(f"Similarity index: {len(duplicates)} of {len(tickets)} tickets repeat one from "
+                        f"the last {self.retention_days} days ({len(indexed)} candidates checked)")
+            return duplicates
+
+        except Exception as e:
+            logger.error(f"Error checking similarity index: {str(e)}")
+            return {}
+        finally:
+            db.close()
+
+    @staticmethod
+    def _similarity(normalized, entry: TicketSignature) -> float:
+        """Jaccard similarity of subject words against a stored ticket, without the same-reporter boost"""
+        words1 = normalized.subject_token_set
+        words2 = frozenset(json.loads(entry.subject_tokens))
+        if not words1 or not words2:
+            # Tickets without subject words only match on identical, non-empty text
+            return 1.0 if normalized.token_set and normalized.content_hash == entry.content_hash else 0.0
+        intersection = len(words1 & words2)
+        return intersection / (len(words1) + len(words2) - intersection)
+
+    def add(self, tickets: List[ZohoTicket]) -> int:
+        """Index tickets (replacing earlier entries for the same ids) and return how many were added"""
+        if not tickets:
+            return 0
+
+        db = next(get_db())
+        try:
+            now = datetime.now()
+            ids = [ticket.id for ticket in tickets]
+            for chunk in chunked(ids):
+                db.query(TicketSignatureBand).filter(
+                    TicketSignatureBand.zoho_ticket_id.in_(chunk)
+                ).delete(synchronize_session=False)
+                db.query(TicketSignature).filter(
+                    TicketSignature.zoho_ticket_id.in_(chunk)
+                ).delete(synchronize_session=False)
+
+            for ticket in {ticket.id: ticket for ticket in tickets}.values():
+                normalized = normalize_ticket(ticket)
+                signature = self.lsh.hasher.signature(normalized.subject_token_set)
+                db.add(TicketSignature(
+                    zoho_ticket_id=ticket.id,
+                    email=ticket.email,
+                    content_hash=normalized.content_hash,
+                    subject_tokens=json.dumps(sorted(normalized.subject_token_set)),
+                    signature=",".join(map(str, signature)),
+                    modified_time=watermark_key(ticket)[0],
+                    created_at=now
+                ))
+                db.add_all(
+                    TicketSignatureBand(band_key=key, zoho_ticket_id=ticket.id)
+                    for key in self.lsh.band_keys(signature)
+                )
+
+            db.commit()
+            return len(tickets)
+
+        except Exception as e:
+            logger.error(f"Error updating similarity index: {str(e)}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+
+    def remove(self, ticket_ids: List[str]):
+        """Drop tickets from the index"""
+        db = next(get_db())
+        try:
+            for chunk in chunked(list(ticket_ids)):
+                db.query(TicketSignatureBand).filter(
+                    TicketSignatureBand.zoho_ticket_id.in_(chunk)
+                ).delete(synchronize_session=False)
+                db.query(TicketSignature).filter(
+                    TicketSignature.zoho_ticket_id.in_(chunk)
+                ).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error removing tickets from similarity index: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def purge_expired(self) -> int:
+        """Drop tickets older than the retention window and return how many were removed"""
+        db = next(get_db())
+        try:
+            expired = [
+                row.zoho_ticket_id for row in
+                db.query(TicketSignature.zoho_ticket_id).filter(TicketSignature.created_at < self._cutoff())
+            ]
+            for chunk in chunked(expired):
+                db.query(TicketSignatureBand).filter(
+                    TicketSignatureBand.zoho_ticket_id.in_(chunk)
+                ).delete(synchronize_session=False)
+                db.query(TicketSignature).filter(
+                    TicketSignature.zoho_ticket_id.in_(chunk)
+                ).delete(synchronize_session=False)
+            db.commit()
+            return len(expired)
+        except Exception as e:
+            logger.error(f"Error purging similarity index: {str(e)}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
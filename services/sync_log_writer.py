@@ -0,0 +1,123 @@
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+from loguru import logger
+
+from models import SyncLog
+from database import get_db, chunked
+
+
+class SyncLogWriter:
+    """Buffers SyncLog rows and writes them in one transaction per batch.
+
+    Rows are keyed by Zoho ticket id, so a later row for the same ticket
+    replaces an earlier buffered one, and a row for a ticket that already has
+    a SyncLog entry updates it. Use the writer as an async context manager
+    around a run: the buffer is flushed every batch_size rows or every
+    flush_interval_ms, and always on exit, including when the run fails.
+    Outside a run, rows are written straight away.
+
+    A failed write puts the rows back in the buffer. flush() and leaving the
+    context then raise, so callers never treat the rows as written; flushes
+    triggered by add() or the timer only log and leave the rows for the next
+    attempt.
+    """
+
+    def __init__(self, batch_size: int = 200, flush_interval_ms: int = 500,
+                 on_flush: Optional[Callable[[List[Dict]], None]] = None):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_ms = flush_interval_ms
+        self.on_flush = on_flush
+        self.flushes = 0
+        self.rows_written = 0
+        self.flush_seconds = 0.0
+        self._rows: Dict[str, Dict] = {}
+        self._first_buffered_at: Optional[float] = None
+        self._active_runs = 0
+        self._timer: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "SyncLogWriter":
+        self._active_runs += 1
+        if self._timer is None and self.flush_interval_ms > 0:
+            self._timer = asyncio.create_task(self._flush_periodically())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._active_runs -= 1
+        if self._active_runs == 0 and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self.flush()
+        return False
+
+    async def _flush_periodically(self):
+        """Flush rows that have waited longer than the interval"""
+        interval = self.flush_interval_ms / 1000
+        while True:
+            await asyncio.sleep(interval)
+            if self._first_buffered_at is not None and time.monotonic() - self._first_buffered_at >= interval:
+                self._try_flush()
+
+    def add(self, row: Dict):
+        """Buffer one SyncLog row (column values, including zoho_ticket_id)"""
+        if self._first_buffered_at is None:
+            self._first_buffered_at = time.monotonic()
+        self._rows[row["zoho_ticket_id"]] = row
+
+        if self._active_runs == 0 or len(self._rows) >= self.batch_size:
+            self._try_flush()
+
+    def _try_flush(self):
+        """Flush, keeping the rows buffered for a later attempt if the write fails"""
+        try:
+            self.flush()
+        except Exception:
+            pass  # Already logged; the rows are back in the buffer
+
+    def flush(self) -> int:
+        """Write every buffered row in one transaction and return how many were written.
+
+        Raises if the write fails, after putting the rows back in the buffer.
+        """
+        if not self._rows:
+            return 0
+
+        rows = list(self._rows.values())
+        first_buffered_at = self._first_buffered_at
+        self._rows = {}
+        self._first_buffered_at = None
+        started = time.perf_counter()
+
+        db = next(get_db())
+        try:
+            existing: Dict[str, int] = {}
+            for chunk in chunked([row["zoho_ticket_id"] for row in rows]):
+                existing.update(
+                    db.query(SyncLog.zoho_ticket_id, SyncLog.id).filter(SyncLog.zoho_ticket_id.in_(chunk)).all()
+                )
+
+            inserts = [row for row in rows if row["zoho_ticket_id"] not in existing]
+            updates = [{**row, "id": existing[row["zoho_ticket_id"]]} for row in rows if row["zoho_ticket_id"] in existing]
+            if inserts:
+                db.bulk_insert_mappings(SyncLog, inserts)
+            if updates:
+                db.bulk_update_mappings(SyncLog, updates)
+            db.commit()
+            self.flushes += 1
+            self.rows_written += len(rows)
+
+        except Exception as e:
+            logger.error(f"Failed to write {len(rows)} sync log rows, keeping them buffered: {str(e)}")
+            db.rollback()
+            # Rows added since (none while this synchronous write runs) are newer and win
+            self._rows = {**{row["zoho_ticket_id"]: row for row in rows}, **self._rows}
+            self._first_buffered_at = first_buffered_at
+            raise
+        finally:
+            db.close()
+            self.flush_seconds += time.perf_counter() - started
+
+        logger.debug(f"Wrote {len(rows)} sync log rows ({len(inserts)} new, {len(updates)} updated)")
+        if self.on_flush is not None:
+            self.on_flush(rows)
+        return len(rows)
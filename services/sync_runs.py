@@ -0,0 +1,350 @@
+import json
+import math
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from loguru import logger
+from sqlalchemy import or_
+
+from models import SyncRun, SyncResult, ZohoTicket, ProcessedTicket, ProcessingStatus
+from services.sync_watermark import watermark_key
+from database import get_db
+
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+RUN_FAILED = "failed"
+RUN_ABANDONED = "abandoned"
+
+
+class SyncRunStore:
+    """Checkpointed records of sync runs for one Zoho organization.
+
+    A run checkpoints after each Zoho page whose tickets are all processed
+    and logged, saving the cursor of the next page and its counters.
+
+    A running run holds a lease: its owner heartbeats while it works. A run
+    left in the running state whose heartbeat is older than lease_seconds
+    was interrupted (the process died), so the next sync claims it and
+    resumes it from that cursor instead of starting over. A run with a
+    live lease is still going, in this or another process, and no second
+    run may start beside it. Runs that end with an error are marked failed
+    and are not resumed.
+    """
+
+    def __init__(self, organization_id: str, lease_seconds: float = 300):
+        self.organization_id = organization_id
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def _lease_cutoff(self) -> datetime:
+        return datetime.now() - timedelta(seconds=self.lease_seconds)
+
+    def log_live_run(self, run: SyncRun):
+        """Say which process holds a live run's lease and when it lapses without a heartbeat"""
+        expires_at = run.heartbeat_at + timedelta(seconds=self.lease_seconds)
+        logger.warning(f"Sync run {run.id} is in progress: {run.owner} holds its lease until "
+                       f"{expires_at:%Y-%m-%d %H:%M:%S} unless it heartbeats again")
+
+    def live_run(self, before_id: Optional[int] = None) -> Optional[SyncRun]:
+        """The latest running run whose lease has not expired, if any (only older than before_id, if given)"""
+        db = next(get_db())
+        try:
+            query = db.query(SyncRun).filter(
+                SyncRun.organization_id == self.organization_id,
+                SyncRun.status == RUN_RUNNING,
+                SyncRun.heartbeat_at >= self._lease_cutoff()
+            )
+            if before_id is not None:
+                query = query.filter(SyncRun.id < before_id)
+            run = query.order_by(SyncRun.id.desc()).first()
+            db.expunge_all()
+            return run
+        except Exception as e:
+            logger.error(f"Error looking up live sync runs: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+    def interrupted_run(self) -> Optional[SyncRun]:
+        """The latest run that never finished and whose lease has expired, if any"""
+        db = next(get_db())
+        try:
+            run = db.query(SyncRun).filter(
+                SyncRun.organization_id == self.organization_id,
+                SyncRun.status == RUN_RUNNING,
+                or_(SyncRun.heartbeat_at.is_(None), SyncRun.heartbeat_at < self._lease_cutoff())
+            ).order_by(SyncRun.id.desc()).first()
+            db.expunge_all()
+            return run
+        except Exception as e:
+            logger.error(f"Error looking up interrupted sync runs: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+    def claim(self, run_id: int) -> bool:
+        """Take over an interrupted run; False if another process claimed it first"""
+        db = next(get_db())
+        try:
+            # Conditional update, so of two processes claiming the same run only one matches
+            claimed = db.query(SyncRun).filter(
+                SyncRun.id == run_id,
+                SyncRun.status == RUN_RUNNING,
+                or_(SyncRun.heartbeat_at.is_(None), SyncRun.heartbeat_at < self._lease_cutoff())
+            ).update({"owner": self.owner, "heartbeat_at": datetime.now()}, synchronize_session=False)
+            db.commit()
+            return claimed == 1
+
+        except Exception as e:
+            logger.error(f"Failed to claim sync run {run_id}: {str(e)}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+    def heartbeat(self, run_id: int) -> bool:
+        """Renew this process's lease on a run"""
+        return self._update(run_id, {"heartbeat_at": datetime.now()}, owned=True)
+
+    def release(self, run_id: int) -> bool:
+        """Give up the lease on a run left running, so the next sync can resume it straight away"""
+        return self._update(run_id, {"heartbeat_at": None}, owned=True)
+
+    def start(self, hours_back: int, modified_since: Optional[datetime], full_resync: bool) -> Optional[SyncRun]:
+        """Record a new run holding the lease.
+
+        Raises RuntimeError if another run started at the same moment and
+        got the lower id; that run goes ahead and this one is abandoned.
+        """
+        run = self._insert(hours_back, modified_since, full_resync)
+        if run is None:
+            return None
+
+        earlier = self.live_run(before_id=run.id)
+        if earlier is not None:
+            self.log_live_run(earlier)
+            self.finish(run.id, RUN_ABANDONED, f"Sync run {earlier.id} was already in progress")
+            raise RuntimeError(f"Sync run {earlier.id} is already in progress (owner {earlier.owner})")
+        return run
+
+    def _insert(self, hours_back: int, modified_since: Optional[datetime], full_resync: bool) -> Optional[SyncRun]:
+        db = next(get_db())
+        try:
+            run = SyncRun(
+                organization_id=self.organization_id,
+                status=RUN_RUNNING,
+                owner=self.owner,
+                heartbeat_at=datetime.now(),
+                full_resync=full_resync,
+                hours_back=hours_back,
+                modified_since=modified_since,
+                pages_committed=0,
+                tickets_fetched=0,
+                tickets_handed_off=0,
+                tickets_logged=0
+            )
+            db.add(run)
+            db.commit()
+            db.refresh(run)
+            db.expunge(run)
+            return run
+
+        except Exception as e:
+            logger.error(f"Failed to record sync run: {str(e)}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+    def checkpoint(self, run_id: int, **fields) -> bool:
+        """Save progress (cursor and counters) of a running run, renewing its lease"""
+        return self._update(run_id, {**fields, "heartbeat_at": datetime.now()}, owned=True)
+
+    def finish(self, run_id: int, status: str, error_message: Optional[str] = None,
+               result: Optional[SyncResult] = None) -> bool:
+        """Close a run as completed, failed or abandoned, storing its result when there is one"""
+        fields = {"status": status, "error_message": error_message, "finished_at": datetime.now()}
+        if result is not None:
+            fields.update(
+                execution_time=result.execution_time,
+                total_tickets=result.total_tickets,
+                processed=result.processed,
+                duplicates=result.duplicates,
+                success=result.success,
+                errors=result.errors,
+                retrying=result.retrying,
+                retries=result.retries,
+                http_requests=result.http_requests,
+                http_bytes_sent=result.http_bytes_sent,
+                http_bytes_received=result.http_bytes_received,
+                metrics=json.dumps({
+                    "stage_seconds": result.stage_seconds,
+                    "stage_counts": result.stage_counts,
+                    "slowest_tickets": result.slowest_tickets
+                })
+            )
+        return self._update(run_id, fields, owned=True)
+
+    def history(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent runs, newest first"""
+        db = next(get_db())
+        try:
+            runs = db.query(SyncRun).filter(
+                SyncRun.organization_id == self.organization_id
+            ).order_by(SyncRun.id.desc()).limit(limit).all()
+            return [self._as_dict(run) for run in runs]
+        except Exception as e:
+            logger.error(f"Error fetching sync run history: {str(e)}")
+            return []
+        finally:
+            db.close()
+
+    def duration_percentiles(self, limit: int = 100) -> Dict[str, Optional[float]]:
+        """p50 and p95 execution time (seconds) of the most recent completed runs"""
+        db = next(get_db())
+        try:
+            durations = sorted(value for (value,) in db.query(SyncRun.execution_time).filter(
+                SyncRun.organization_id == self.organization_id,
+                SyncRun.status == RUN_COMPLETED,
+                SyncRun.execution_time.isnot(None)
+            ).order_by(SyncRun.id.desc()).limit(limit))
+        except Exception as e:
+            logger.error(f"Error computing sync run percentiles: {str(e)}")
+            durations = []
+        finally:
+            db.close()
+
+        def percentile(fraction: float) -> Optional[float]:
+            # Nearest-rank: the smallest duration at least this fraction of runs did not exceed
+            if not durations:
+                return None
+            return durations[max(0, math.ceil(fraction * len(durations)) - 1)]
+
+        return {"runs": len(durations), "p50": percentile(0.5), "p95": percentile(0.95)}
+
+    @staticmethod
+    def _as_dict(run: SyncRun) -> Dict[str, Any]:
+        summary = {
+            column.name: getattr(run, column.name)
+            for column in SyncRun.__table__.columns
+            if column.name not in ("metrics", "next_page_url", "failed_modified_time", "failed_ticket_id", "heartbeat_at")
+        }
+        summary.update(json.loads(run.metrics) if run.metrics else {})
+        for key, value in summary.items():
+            if isinstance(value, datetime):
+                summary[key] = value.isoformat()
+        return summary
+
+    def _update(self, run_id: int, fields: dict, owned: bool = False) -> bool:
+        db = next(get_db())
+        try:
+            query = db.query(SyncRun).filter(SyncRun.id == run_id)
+            if owned:
+                # A run that another process has claimed since is no longer ours to touch
+                query = query.filter(SyncRun.owner == self.owner)
+            updated = query.update(fields, synchronize_session=False)
+            db.commit()
+            return updated == 1
+
+        except Exception as e:
+            logger.error(f"Failed to update sync run {run_id}: {str(e)}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+
+class SyncRunProgress:
+    """Tracks which fetched pages of a run are fully handled.
+
+    Pages finish out of order (a page of duplicates is done as soon as it is
+    deduplicated, another waits for its ClickUp calls), but a checkpoint may
+    only cover a gap-free prefix of pages, so finished pages are released in
+    page order.
+
+    Only rows of committed pages count towards tickets_logged. Rows the
+    writer flushes for later pages are logged again if the run is resumed
+    from the checkpoint, so counting them earlier would count them twice.
+
+    A ticket that fails outright holds the watermark back so the next run
+    retries it, but only while it was modified within the last
+    hold_back_hours; a ticket that keeps failing must not pin the watermark
+    and grow every later fetch window.
+    """
+    
+    def __init__(self, run: Optional[SyncRun], hold_back_hours: float = 24):
+        self.run_id = run.id if run is not None else None
+        self.pages_committed = run.pages_committed if run is not None else 0
+        self.next_page_url = run.next_page_url if run is not None else None
+        self.fetch_finished = self.pages_committed > 0 and self.next_page_url is None
+        self.tickets_fetched = run.tickets_fetched if run is not None else 0
+        self.tickets_handed_off = run.tickets_handed_off if run is not None else 0
+        self.tickets_logged = run.tickets_logged if run is not None else 0
+        self.hold_back_since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=hold_back_hours)
+        self.first_failure = None
+        if run is not None and run.failed_ticket_id is not None:
+            if self._holds_back((run.failed_modified_time, run.failed_ticket_id)):
+                self.first_failure = (run.failed_modified_time, run.failed_ticket_id)
+        
+        self.pages: Dict[int, Dict] = {}  # page number -> keys, next URL and tickets still in flight
+        self.page_of_ticket: Dict[str, List[int]] = {}  # A ticket edited while paging can show up on two pages
+        self.next_page_number = self.pages_committed
+    
+    def page_fetched(self, page: List[ZohoTicket], next_url: Optional[str]) -> int:
+        """Register a fetched page and return its number within the run"""
+        page_number = self.next_page_number
+        self.next_page_number += 1
+        self.pages[page_number] = {
+            "keys": [watermark_key(ticket) for ticket in page],
+            "next_url": next_url,
+            "pending": None,  # Unknown until the page is deduplicated
+            "done": False
+        }
+        return page_number
+    
+    def page_deduplicated(self, page_number: int, unique_tickets: List[ZohoTicket], duplicates_logged: int = 0) -> bool:
+        """Returns True when the page needs no ClickUp calls and is already done"""
+        page = self.pages[page_number]
+        page["pending"] = len(unique_tickets)
+        page["handed_off"] = len(unique_tickets)
+        page["rows"] = duplicates_logged + len(unique_tickets)  # Each unique ticket logs one result row
+        for ticket in unique_tickets:
+            self.page_of_ticket.setdefault(ticket.id, []).append(page_number)
+        page["done"] = page["pending"] == 0
+        return page["done"]
+    
+    def ticket_processed(self, processed_ticket: ProcessedTicket) -> bool:
+        """Returns True when this was the last in-flight ticket of its page"""
+        page_numbers = self.page_of_ticket[processed_ticket.zoho_ticket.id]
+        page = self.pages[page_numbers.pop(0)]
+        if not page_numbers:
+            del self.page_of_ticket[processed_ticket.zoho_ticket.id]
+        if processed_ticket.processing_status == ProcessingStatus.FAILED:
+            key = watermark_key(processed_ticket.zoho_ticket)
+            if self._holds_back(key):
+                page["first_failure"] = min(key, page.get("first_failure", key))
+        page["pending"] -= 1
+        page["done"] = page["pending"] == 0
+        return page["done"]
+    
+    def _holds_back(self, key) -> bool:
+        """Whether a failed ticket may still keep the watermark behind it"""
+        if key[0] >= self.hold_back_since:
+            return True
+        logger.warning(f"Ticket {key[1]} keeps failing but was last modified before {self.hold_back_since:%Y-%m-%d %H:%M:%S} "
+                       f"UTC; no longer holding the sync watermark back for it")
+        return False
+    
+    def has_ready_pages(self) -> bool:
+        """Whether the page after the last committed one is done"""
+        return bool(self.pages.get(self.pages_committed, {}).get("done"))
+    
+    def ready_pages(self) -> List[Dict]:
+        """Pop the done pages that directly follow the last committed one"""
+        ready = []
+        while self.pages.get(self.pages_committed, {}).get("done"):
+            ready.append(self.pages.pop(self.pages_committed))
+            self.pages_committed += 1
+        return ready
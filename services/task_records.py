@@ -0,0 +1,46 @@
+from typing import Optional
+from loguru import logger
+
+from models import ClickUpTaskRecord
+from database import get_db
+
+
+class ClickUpTaskRecords:
+    """Idempotency records of the ClickUp task created for each Zoho ticket.
+
+    A record is committed as soon as its task exists, independently of the
+    batched SyncLog writes, so a run resumed after a crash (or a retry of a
+    ticket whose result was never logged) reuses the task instead of
+    creating a second one.
+    """
+
+    def task_for(self, zoho_ticket_id: str) -> Optional[str]:
+        """ClickUp task already created for a ticket"""
+        db = next(get_db())
+        try:
+            record = db.query(ClickUpTaskRecord).filter(ClickUpTaskRecord.zoho_ticket_id == zoho_ticket_id).first()
+            return record.clickup_task_id if record else None
+        except Exception as e:
+            logger.error(f"Error reading task record for ticket {zoho_ticket_id}: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+    def record(self, zoho_ticket_id: str, clickup_task_id: str, sync_run_id: Optional[int] = None) -> bool:
+        """Remember the task created for a ticket"""
+        db = next(get_db())
+        try:
+            db.merge(ClickUpTaskRecord(
+                zoho_ticket_id=zoho_ticket_id,
+                clickup_task_id=clickup_task_id,
+                sync_run_id=sync_run_id
+            ))
+            db.commit()
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to record task {clickup_task_id} for ticket {zoho_ticket_id}: {str(e)}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
@@ -0,0 +1,100 @@
+import csv
+import math
+import re
+from collections import Counter, defaultdict
+from typing import List, Dict, Tuple, Optional
+from loguru import logger
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _label_key(label: str) -> str:
+    """Normalize a category label so 'other on ground issues' matches 'Other On-Ground Issues'"""
+    return " ".join(_tokenize(label))
+
+
+class TfidfCentroidClassifier:
+    """Nearest-centroid classifier over TF-IDF vectors of labelled ticket text"""
+
+    def __init__(self):
+        self.idf: Dict[str, float] = {}
+        self.centroids: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def categories(self) -> List[str]:
+        """Categories that had labelled training samples"""
+        return list(self.centroids)
+
+    def fit(self, samples: List[Tuple[str, str]]) -> "TfidfCentroidClassifier":
+        """Train from (text, category) pairs"""
+        documents = [(Counter(_tokenize(text)), category) for text, category in samples]
+        documents = [(terms, category) for terms, category in documents if terms]
+
+        document_frequency = Counter()
+        for terms, _ in documents:
+            document_frequency.update(terms.keys())
+
+        total = len(documents)
+        self.idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        sums: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for terms, category in documents:
+            for term, weight in self._vectorize_counts(terms).items():
+                sums[category][term] += weight
+
+        self.centroids = {category: self._normalize(vector) for category, vector in sums.items()}
+        return self
+
+    @classmethod
+    def from_csv(cls, csv_path: str, categories: List[str]) -> "TfidfCentroidClassifier":
+        """Train from an Issues,Category CSV, keeping rows whose label matches a known category"""
+        known = {_label_key(category): category for category in categories}
+        samples = []
+        skipped = 0
+
+        with open(csv_path, "r", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                issue = (row.get("Issues") or "").strip()
+                category = known.get(_label_key(row.get("Category") or ""))
+                if issue and category:
+                    samples.append((issue, category))
+                else:
+                    skipped += 1
+
+        logger.info(f"Trained TF-IDF classifier on {len(samples)} issues from {csv_path} ({skipped} rows skipped)")
+        return cls().fit(samples)
+
+    def _vectorize_counts(self, terms: Counter) -> Dict[str, float]:
+        """L2-normalized TF-IDF vector for a bag of terms"""
+        vector = {term: count * self.idf[term] for term, count in terms.items() if term in self.idf}
+        return self._normalize(vector)
+
+    @staticmethod
+    def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+        """Scale a sparse vector to unit length"""
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        if not norm:
+            return {}
+        return {term: value / norm for term, value in vector.items()}
+
+    def predict(self, text: str, candidates: Optional[List[str]] = None) -> Tuple[Optional[str], float]:
+        """Nearest centroid (among candidates, if given) and its cosine similarity"""
+        vector = self._vectorize_counts(Counter(_tokenize(text)))
+        best_category = None
+        best_similarity = 0.0
+
+        for category in candidates if candidates is not None else self.centroids:
+            centroid = self.centroids.get(category)
+            if centroid is None:
+                continue
+            similarity = sum(value * centroid.get(term, 0.0) for term, value in vector.items())
+            if similarity > best_similarity:
+                best_category = category
+                best_similarity = similarity
+
+        return best_category, best_similarity
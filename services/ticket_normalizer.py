@@ -0,0 +1,27 @@
+import hashlib
+from typing import List, FrozenSet, Optional
+from models import ZohoTicket
+
+class NormalizedTicket:
+    """Lowercased text and token features of a ticket, shared by categorization and dedup"""
+    
+    __slots__ = ("text", "tokens", "token_set", "subject_tokens", "subject_token_set", "content_hash", "simhash")
+    
+    def __init__(self, ticket: ZohoTicket):
+        # Exactly the text the keyword scorer has always matched against
+        self.text: str = f"{ticket.subject} {ticket.description}".lower()
+        self.tokens: List[str] = self.text.split()
+        self.token_set: FrozenSet[str] = frozenset(self.tokens)
+        self.subject_tokens: List[str] = (ticket.subject or "").lower().split()
+        self.subject_token_set: FrozenSet[str] = frozenset(self.subject_tokens)
+        self.content_hash: str = hashlib.sha1(self.text.encode("utf-8")).hexdigest()
+        # Filled in by services.simhash.ticket_simhash on first use
+        self.simhash: Optional[int] = None
+
+def normalize_ticket(ticket: ZohoTicket) -> NormalizedTicket:
+    """Get the normalized form of a ticket, computing it on first use"""
+    normalized = ticket._normalized
+    if normalized is None:
+        normalized = NormalizedTicket(ticket)
+        ticket._normalized = normalized
+    return normalized
@@ -1,16 +1,22 @@
-import requests
 import asyncio
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import List, Optional, AsyncIterator, Tuple
+from datetime import datetime, timedelta, timezone
+import httpx
 from loguru import logger
 from config import settings
 from models import ZohoTicket
+from services.ticket_normalizer import normalize_ticket
+from services.http_client import get_http_client
+from services.sync_watermark import watermark_key
+
+_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
 
 class ZohoService:
     def __init__(self):
         self.base_url = f"https://desk.zoho.com/api/v1"
         self.access_token = None
         self.token_expires_at = None
+        self.page_size = 100
     
     async def get_access_token(self) -> str:
         """Get or refresh access token"""
@@ -25,7 +31,7 @@ class ZohoService:
             "grant_type": "refresh_token"
         }
         
-        response = requests.post(url, data=data)
+        response = await get_http_client().post(url, data=data)
         response.raise_for_status()
         
         token_data = response.json()
@@ -47,52 +53,94 @@ class ZohoService:
     
     async def fetch_recent_tickets(self, hours_back: int = 24) -> List[ZohoTicket]:
         """Fetch tickets from the last N hours"""
+        all_tickets = []
+        async for page in self.iter_ticket_pages(hours_back):
+            all_tickets.extend(page)
+        
+        logger.info(f"Total tickets fetched: {len(all_tickets)}")
+        return all_tickets
+    
+    async def iter_ticket_pages(self, hours_back: int = 24,
+                                modified_since: Optional[datetime] = None) -> AsyncIterator[List[ZohoTicket]]:
+        """Yield tickets from the last N hours (or modified since a UTC time) one API page at a time"""
+        async for page, _ in self.iter_ticket_page_cursors(hours_back, modified_since):
+            yield page
+    
+    async def iter_ticket_page_cursors(self, hours_back: int = 24, modified_since: Optional[datetime] = None,
+                                       start_url: Optional[str] = None) -> AsyncIterator[Tuple[List[ZohoTicket], Optional[str]]]:
+        """Yield (page, URL of the following page) pairs, optionally resuming at a saved page URL.
+        
+        Pages are keyed on modifiedTime rather than an offset: each request
+        asks for tickets modified since the last second seen, skipping the
+        tickets already returned for that second. A ticket modified during
+        the sync moves to the end of the order, and with offsets it would
+        shift an unread ticket onto a page that was already fetched.
+        """
         try:
             headers = await self.get_headers()
             
-            # Calculate time filter
-            from_time = datetime.now() - timedelta(hours=hours_back)
-            from_time_str = from_time.strftime("%Y-%m-%dT%H:%M:%S.000Z")
-            
-            url = f"{self.base_url}/tickets"
-            params = {
-                "limit": 100,
-                "sortBy": "modifiedTime",
-                "modifiedTime": from_time_str,
-                "include": "contacts"
-            }
-            
-            all_tickets = []
+            if start_url:
+                # Saved page URLs carry the position; tickets of its first second may come again
+                params = httpx.URL(start_url).params
+                anchor = datetime.strptime(params["modifiedTime"], _TIME_FORMAT)
+                skip = int(params.get("from", 0))
+            else:
+                if modified_since is not None:
+                    anchor = modified_since
+                else:
+                    anchor = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=hours_back)
+                anchor = anchor.replace(microsecond=0)
+                skip = 0
+            seen_at_anchor = set()
+            url = self._ticket_page_url(anchor, skip)
             
             while url:
-                response = requests.get(url, headers=headers, params=params)
+                response = await get_http_client().get(url, headers=headers)
                 response.raise_for_status()
                 
-                data = response.json()
+                # Zoho answers 204 with no body when nothing matches
+                data = response.json() if response.content else {}
                 tickets_data = data.get("data", [])
                 
-                for ticket_data in tickets_data:
-                    ticket = self._parse_ticket(ticket_data)
-                    if ticket:
-                        all_tickets.append(ticket)
+                fetched = [ticket for ticket in map(self._parse_ticket, tickets_data) if ticket]
+                page = [ticket for ticket in fetched if ticket.id not in seen_at_anchor]
                 
-                # Check for pagination
-                url = data.get("next", None)
-                params = None  # Clear params for subsequent requests
+                url = None
+                if len(tickets_data) >= self.page_size and fetched:
+                    seconds = {ticket.id: watermark_key(ticket)[0].replace(microsecond=0) for ticket in fetched}
+                    last_second = max(seconds.values())
+                    if last_second > anchor:
+                        anchor, skip = last_second, 0
+                        seen_at_anchor = set()
+                    else:
+                        # A whole page within one second: step through that second by offset
+                        skip += len(tickets_data)
+                    seen_at_anchor.update(ticket_id for ticket_id, second in seconds.items() if second == anchor)
+                    url = self._ticket_page_url(anchor, skip)
                 
                 logger.info(f"Fetched {len(tickets_data)} tickets from current page")
-            
-            logger.info(f"Total tickets fetched: {len(all_tickets)}")
-            return all_tickets
+                yield page, url
             
         except Exception as e:
             logger.error(f"Error fetching tickets from Zoho: {str(e)}")
             raise
     
+    def _ticket_page_url(self, modified_since: datetime, skip: int = 0) -> str:
+        """URL of the ticket page starting at a UTC modifiedTime, skipping that many matches"""
+        params = {
+            "limit": self.page_size,
+            "sortBy": "modifiedTime",
+            "modifiedTime": modified_since.strftime(_TIME_FORMAT),
+            "include": "contacts"
+        }
+        if skip:
+            params["from"] = skip
+        return str(httpx.URL(f"{self.base_url}/tickets", params=params))
+    
     def _parse_ticket(self, ticket_data: dict) -> Optional[ZohoTicket]:
         """Parse ticket data from Zoho API response"""
         try:
-            return ZohoTicket(
+            ticket = ZohoTicket(
                 id=ticket_data["id"],
                 subject=ticket_data.get("subject", ""),
                 description=ticket_data.get("description", ""),
@@ -107,6 +155,10 @@ class ZohoService:
                 contact_id=ticket_data.get("contactId"),
                 email=ticket_data.get("contact", {}).get("email")
             )
+            
+            # Lowercase and tokenize once; categorization and dedup reuse the result
+            normalize_ticket(ticket)
+            return ticket
         except Exception as e:
             logger.warning(f"Failed to parse ticket {ticket_data.get('id', 'unknown')}: {str(e)}")
             return None
@@ -117,7 +169,7 @@ class ZohoService:
             headers = await self.get_headers()
             url = f"{self.base_url}/tickets/{ticket_id}"
             
-            response = requests.get(url, headers=headers)
+            response = await get_http_client().get(url, headers=headers)
             response.raise_for_status()
             
             ticket_data = response.json()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test the page bookkeeping of checkpointed sync runs across a resume
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pytest
+
+pytest.importorskip("loguru")
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("pydantic_settings")
+
+from models import ZohoTicket, ProcessedTicket, ProcessingStatus
+from services.sync_runs import SyncRunProgress
+
+NOW = datetime.utcnow()
+
+
+def _ticket(ticket_id, minutes_ago=10):
+    modified = NOW - timedelta(minutes=minutes_ago)
+    return ZohoTicket(id=ticket_id, subject="Portal issue", description="", status="Open", priority="High",
+                      created_time=modified, modified_time=modified)
+
+
+def _processed(ticket, status=ProcessingStatus.SUCCESS):
+    return ProcessedTicket(zoho_ticket=ticket, category="Learning Portal Issues", team="Product",
+                           processing_status=status)
+
+
+def _interrupted_run(**fields):
+    run = dict(id=7, pages_committed=2, next_page_url="https://desk.zoho.com/api/v1/tickets?page=3",
+               tickets_fetched=150, tickets_handed_off=120, tickets_logged=140,
+               failed_modified_time=None, failed_ticket_id=None)
+    run.update(fields)
+    return SimpleNamespace(**run)
+
+
+def _commit(progress):
+    """The counter updates AutomationService._commit_pages makes for each ready page"""
+    for page in progress.ready_pages():
+        progress.tickets_fetched += len(page["keys"])
+        progress.tickets_handed_off += page["handed_off"]
+        progress.tickets_logged += page["rows"]
+        progress.next_page_url = page["next_url"]
+
+
+def test_resumed_run_continues_its_counters():
+    """A resumed run adds the rows of pages it commits to the checkpointed totals"""
+    progress = SyncRunProgress(_interrupted_run())
+    assert progress.next_page_number == 2
+
+    tickets = [_ticket("a"), _ticket("b"), _ticket("c")]
+    page_number = progress.page_fetched(tickets, None)
+    assert page_number == 2
+    assert not progress.page_deduplicated(page_number, tickets[:2], duplicates_logged=1)
+
+    assert not progress.ticket_processed(_processed(tickets[0]))
+    assert progress.ticket_processed(_processed(tickets[1]))
+    _commit(progress)
+
+    assert progress.pages_committed == 3
+    assert progress.tickets_fetched == 153
+    assert progress.tickets_handed_off == 122
+    assert progress.tickets_logged == 143
+    assert progress.next_page_url is None
+
+
+def test_rows_of_uncommitted_pages_are_not_counted():
+    """A page finished behind an unfinished one is counted only once the gap closes"""
+    progress = SyncRunProgress(_interrupted_run())
+    first = [_ticket("a")]
+    second = [_ticket("b"), _ticket("c")]
+    first_page = progress.page_fetched(first, "next-1")
+    second_page = progress.page_fetched(second, None)
+
+    progress.page_deduplicated(first_page, first)
+    assert progress.page_deduplicated(second_page, [], duplicates_logged=2)
+    assert not progress.has_ready_pages()
+    assert progress.tickets_logged == 140
+
+    assert progress.ticket_processed(_processed(first[0]))
+    _commit(progress)
+    assert progress.pages_committed == 4
+    assert progress.tickets_logged == 143
+
+
+def test_resume_keeps_a_recent_failure_holding_back_the_watermark():
+    """The checkpointed first failure survives the resume while it is within the hold-back window"""
+    failed_at = NOW - timedelta(hours=1)
+    progress = SyncRunProgress(_interrupted_run(failed_modified_time=failed_at, failed_ticket_id="x"))
+    assert progress.first_failure == (failed_at, "x")
+
+    stale = SyncRunProgress(_interrupted_run(failed_modified_time=NOW - timedelta(days=3), failed_ticket_id="x"),
+                            hold_back_hours=24)
+    assert stale.first_failure is None
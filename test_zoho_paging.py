@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test that Zoho ticket paging does not lose tickets modified during a sync
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("loguru")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("sqlalchemy")
+
+import httpx
+from services import zoho_service
+from services.zoho_service import ZohoService, _TIME_FORMAT
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+        self.content = b"{}" if data else b""
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeZohoDesk:
+    """In-memory ticket list answering GET /tickets like Zoho: sorted by modifiedTime, paged by offset"""
+
+    def __init__(self, tickets, on_request=None):
+        self.tickets = tickets
+        self.on_request = on_request
+        self.requests = 0
+
+    async def get(self, url, headers=None, params=None):
+        query = httpx.URL(url, params=params).params
+        since = datetime.strptime(query["modifiedTime"], _TIME_FORMAT)
+        offset = int(query.get("from", 0))
+        limit = int(query["limit"])
+        matching = sorted(
+            (ticket for ticket in self.tickets if ticket["modified"] >= since),
+            key=lambda ticket: ticket["modified"]
+        )
+        page = [_ticket_data(ticket) for ticket in matching[offset:offset + limit]]
+
+        self.requests += 1
+        if self.on_request:
+            self.on_request(self.requests)
+        return FakeResponse({"data": page} if page else {})
+
+
+def _ticket_data(ticket):
+    stamp = ticket["modified"].strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    return {
+        "id": ticket["id"],
+        "subject": f"Ticket {ticket['id']}",
+        "description": "",
+        "status": "Open",
+        "priority": "High",
+        "createdTime": stamp,
+        "modifiedTime": stamp,
+        "contact": {"email": "learner@example.com"}
+    }
+
+
+def _fetch_all(service, desk, start_url=None):
+    async def fetch():
+        ids = []
+        async for page, _ in service.iter_ticket_page_cursors(modified_since=START, start_url=start_url):
+            ids.extend(ticket.id for ticket in page)
+        return ids
+
+    return asyncio.run(fetch())
+
+
+def _service(monkeypatch, desk, page_size):
+    service = ZohoService()
+    service.page_size = page_size
+
+    async def headers():
+        return {}
+
+    monkeypatch.setattr(service, "get_headers", headers)
+    monkeypatch.setattr(zoho_service, "get_http_client", lambda: desk)
+    return service
+
+
+def test_ticket_modified_between_pages_does_not_hide_others(monkeypatch):
+    """Moving a fetched ticket to the end of the order must not shift an unfetched one onto a read page"""
+    tickets = [{"id": str(index), "modified": START + timedelta(minutes=index)} for index in range(10)]
+
+    def modify_after_first_page(request_number):
+        if request_number == 1:
+            tickets[1]["modified"] = START + timedelta(hours=1)
+
+    desk = FakeZohoDesk(tickets, on_request=modify_after_first_page)
+    ids = _fetch_all(_service(monkeypatch, desk, page_size=4), desk)
+
+    assert set(ids) == {str(index) for index in range(10)}
+    assert ids.count("1") == 2  # Seen before and after its modification
+
+
+def test_tickets_sharing_one_second_are_paged_by_offset(monkeypatch):
+    """More tickets than fit on a page within the same second are each returned exactly once"""
+    tickets = [{"id": f"{index:02d}", "modified": START} for index in range(9)]
+    tickets += [{"id": "later", "modified": START + timedelta(seconds=1)}]
+
+    desk = FakeZohoDesk(tickets)
+    ids = _fetch_all(_service(monkeypatch, desk, page_size=4), desk)
+
+    assert sorted(ids) == sorted(ticket["id"] for ticket in tickets)
+
+
+def test_resume_from_saved_page_url(monkeypatch):
+    """A saved page URL carries the position, so a resumed fetch continues from it"""
+    tickets = [{"id": str(index), "modified": START + timedelta(minutes=index)} for index in range(10)]
+    desk = FakeZohoDesk(tickets)
+    service = _service(monkeypatch, desk, page_size=4)
+
+    start_url = service._ticket_page_url(START + timedelta(minutes=6))
+    assert _fetch_all(service, desk, start_url=start_url) == ["6", "7", "8", "9"]